@@ -2,4 +2,10 @@ from .project_ import *
 from .task import *
 from .data_type import *
 
-__all__ = ["DataType", "Project", "Task"]  # allows the use of from Model import*
+__all__ = [
+    "DataType",
+    "Project",
+    "Task",
+    "encode_task_list",
+    "decode_task_list",
+]  # allows the use of from Model import*
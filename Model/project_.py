@@ -1,5 +1,8 @@
 from .data_type import DataType  # Import parent class DataType
-from ast import literal_eval # Import ast to convert a string to a list
+from ast import literal_eval  # Import ast to convert a string to a list of old files
+
+# Separator of the task ids in the task_list column of the csv file, ie: 1|2|5
+TASK_LIST_SEPARATOR = "|"
 
 # this file was reformated by black module
 
@@ -17,6 +20,9 @@ class Project(DataType):
         DataType: A parent class providing basic data type functionality.
     """
 
+    __slots__ = ("task_list",)
+    fields = DataType.fields + __slots__
+
     def __init__(self):
         super().__init__()
         self.task_list = list()
@@ -50,5 +56,54 @@ class Project(DataType):
                 f"🔴  The Task is already linked to this project. task list = {self.task_list} 🔴"
             )
         else:
-            # Use ast.literal_eval to safely convert the string representation of a list to an actual list
-            self.task_list += literal_eval(data["task_list"])
+            task_list = data["task_list"]
+            if isinstance(task_list, str):
+                task_list = decode_task_list(task_list)
+            self.task_list += task_list
+
+    def data_from_values(self, values: tuple) -> None:
+        (
+            self.id,
+            self.name,
+            self.description,
+            self.detailed_description,
+            self.creation_date,
+            self.deadline,
+            self.state,
+            task_list,
+        ) = values
+        # a copy, the list of the row is not changed with the project
+        self.task_list = (
+            decode_task_list(task_list)
+            if isinstance(task_list, str)
+            else list(task_list)
+        )
+
+
+def encode_task_list(task_list: list) -> str:
+    """
+    Convert a task list to the string stored in the csv file.
+    Args:
+        task_list (list[str]): task ids
+    Returns:
+        str: task ids separated by TASK_LIST_SEPARATOR, ie: 1|2|5
+    """
+    return TASK_LIST_SEPARATOR.join(task_list)
+
+
+def decode_task_list(value: str) -> list:
+    """
+    Convert the task_list column of the csv file to a list of task ids.
+    Old files store the representation of a python list, ie: ['1', '2'],
+    it is still read with ast.literal_eval.
+    Args:
+        value (str): task_list column
+    Returns:
+        list[str]: task ids
+    """
+    if not value:
+        return []
+    if value[0] == "[":
+        # Use ast.literal_eval to safely convert the string representation of a list to an actual list
+        return literal_eval(value)
+    return value.split(TASK_LIST_SEPARATOR)
@@ -16,6 +16,9 @@ class Task(DataType):
         DataType: A parent class providing basic data type functionality.
     """
 
+    __slots__ = ("linked_project",)
+    fields = DataType.fields + __slots__
+
     def __init__(self):
         super().__init__()
         self.linked_project = ""
@@ -52,3 +55,15 @@ class Task(DataType):
         else:
             if "linked_project" in data:
                 self.linked_project = data["linked_project"]
+
+    def data_from_values(self, values: tuple) -> None:
+        (
+            self.id,
+            self.name,
+            self.description,
+            self.detailed_description,
+            self.creation_date,
+            self.deadline,
+            self.state,
+            self.linked_project,
+        ) = values
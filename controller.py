@@ -1,11 +1,51 @@
 from Model import *
+from contextlib import ExitStack
+from storage import (
+    OffsetIndex,
+    SqliteStorage,
+    TextIndex,
+    append_snapshot,
+    get_journal,
+    get_lock,
+    paused_gc,
+    read_snapshot,
+    replay,
+    write_snapshot,
+)
 import os
 import csv
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from itertools import islice
+from operator import itemgetter
+from typing import Iterator
 
 # this file was reformated by black module
 # File paths for projects and tasks databases
 PROJECTS_File = "./DB/projects.csv"
 TASKS_File = "./DB/tasks.csv"
+DATABASE_File = "./DB/data.db"
+# Storage used by Projects and Tasks: "csv" files, "journal" (csv files and a journal of the changes)
+# or a "sqlite" database
+STORAGE = os.environ.get("CS50_STORAGE", "csv")
+# Seconds during which the changes appended to a journal share one fsync, 0 to fsync each change
+GROUP_COMMIT_WINDOW = float(os.environ.get("CS50_GROUP_COMMIT", "0"))
+# Keep a binary snapshot next to each csv file (ie: ./DB/tasks.csv.snapshot) for a fast loading, "0" to disable
+SNAPSHOT = os.environ.get("CS50_SNAPSHOT", "1") != "0"
+# Keep the full-text index next to each csv file (ie: ./DB/tasks.csv.words) for a fast loading, "0" to disable
+TEXT_INDEX = os.environ.get("CS50_TEXT_INDEX", "1") != "0"
+# States of the finished projects and tasks, compared in lower case (ie: CS50_CLOSED_STATES="Completed,Cancelled")
+# Size in MB of a csv file above which it is read row by row instead of being loaded in memory,
+# a single project or task of such a file is read with the offset index (ie: ./DB/tasks.csv.offsets)
+STREAM_THRESHOLD = int(
+    float(os.environ.get("CS50_STREAM_THRESHOLD", "64")) * 1024 * 1024
+)
+CLOSED_STATES = tuple(
+    state.strip().lower()
+    for state in os.environ.get("CS50_CLOSED_STATES", "Completed,Done").split(",")
+    if state.strip()
+)
 
 
 class Data:
@@ -13,82 +53,795 @@ class Data:
     A generic data management class for handling CSV-based data storage and retrieval.
     This class provides methods to read from and write to CSV files,
     convert data between dictionary and object representations,
+    With storage="sqlite" the data is read from and written to a SQLite database instead.
+    With storage="journal" the changes are appended to a journal file next to the CSV file,
+    the CSV file is rewritten with the journal changes (compaction) when the journal
+    has journal_compact_threshold changes.
     Attributes :
         data_type (str): Type of data being managed (project' or 'task')
         path_file (str): Path to the CSV file
+        storage (str): "csv" or "sqlite"
+        sqlite (SqliteStorage | None): SQLite database used when storage is "sqlite"
+        journal (Journal | None): journal of the changes used when storage is "journal"
+        snapshot (str | None): Path to the binary snapshot of the CSV file, used when storage is "csv"
+        offsets (OffsetIndex | None): position of each row in the CSV file, used when storage is "csv"
+            to read a single object of a file too big to be loaded
+        lock (FileLock): lock shared with the other programs, shared to read the file, exclusive to write it
         data (list[dict]): Raw data from CSV file as list of dictionaries
         objects (list[DataType]): list of object converted by self.get_objects() from self.data (project or task)
+        index (dict[str, DataType]): objects by id, kept in sync with self.objects for constant time lookups
+        property_index (dict[str, dict[str, set[str]]]): for each property in indexed_properties,
+            the ids of the objects having a value (or a list containing the value)
+        sorted_index (dict[str, list[tuple]]): for each property in sorted_properties,
+            the (value, int id) of all the objects sorted, searched with bisect
+        text_index (TextIndex | None): ids of the objects containing each word of the text_properties,
+            None until self.load_text_index() reads or builds it
+        due_index (list[tuple] | None): (deadline, int id) of the objects not in closed_states sorted,
+            the most urgent first
+        report (ProjectReport | None): aggregates of the tasks by linked project, built by
+            Tasks.project_report() and then kept up to date, None until it is asked
+        words (str | None): Path to the file of the text index, used when storage is "csv" or "journal"
+        signature (tuple | None): (mtime, size, inode) of the file the objects were loaded from
+        changed (set[str]): ids of the objects added or updated since the last save
+        deleted (set[str]): ids of the objects deleted since the last save
+        appended (list[str]): ids of the objects added since the last save, in order
+        undo (list | None): changes recorded since self.begin() to undo them with self.rollback()
+        id_allocator (IdAllocator): gives the lowest id not used by an object
+    Class attributes :
+        cache (dict): parsed state of each file shared by all instances, by absolute path
+        cache_hits (int): number of data_from_csv() served from the cache
+        cache_misses (int): number of data_from_csv() that had to parse the file
+        stream_threshold (int): size in bytes above which iter_objects() reads the file
+            row by row instead of loading it in memory, and find_object() reads a single row
+            with self.offsets (CS50_STREAM_THRESHOLD in MB, 64 by default)
+        journal_compact_threshold (int): number of changes in the journal that trigger a compaction
     """
 
-    def __init__(self, path_file: str, data_type: str):
+    indexed_properties: tuple = ("state",)
+    sorted_properties: tuple = ("deadline",)
+    text_properties: tuple = ("name", "description", "detailed_description")
+    closed_states: tuple = CLOSED_STATES
+    cache: dict = {}
+    cache_hits: int = 0
+    cache_misses: int = 0
+    stream_threshold: int = STREAM_THRESHOLD
+    journal_compact_threshold: int = 1000
+
+    def __init__(
+        self,
+        path_file: str,
+        data_type: str,
+        storage: str = "csv",
+        database: str = DATABASE_File,
+    ):
         """
         Initialize the Data object with file path and data type.
         Args:
             path_file (str): Path to the CSV file
             data_type (str): Type of data being managed
+            storage (str): "csv", "journal" or "sqlite"
+            database (str): Path to the SQLite database, used when storage is "sqlite"
         """
+        if storage not in ["csv", "journal", "sqlite"]:
+            raise ValueError(f"⚠️  Unknown storage {storage} ⚠️")
         self.data_type = data_type
         self.path_file = path_file
+        self.storage = storage
+        self.sqlite = SqliteStorage(database) if storage == "sqlite" else None
+        self.journal = (
+            get_journal(path_file + ".journal", GROUP_COMMIT_WINDOW)
+            if storage == "journal"
+            else None
+        )
+        self.snapshot = (
+            path_file + ".snapshot" if storage == "csv" and SNAPSHOT else None
+        )
+        self.offsets = OffsetIndex(path_file) if storage == "csv" else None
+        self.lock = get_lock(path_file + ".lock")
         self.data: list = []
         self.objects: list = []
+        self.index: dict = {}
+        self.property_index: dict = {
+            property_: {} for property_ in self.indexed_properties
+        }
+        self.sorted_index: dict = {
+            property_: [] for property_ in self.sorted_properties
+        }
+        self.text_index: TextIndex | None = TextIndex()
+        self.due_index: list | None = []
+        self.report: ProjectReport | None = None
+        self.words = (
+            path_file + ".words" if storage != "sqlite" and TEXT_INDEX else None
+        )
+        self.signature: tuple | None = None
+        self.changed: set = set()
+        self.deleted: set = set()
+        self.appended: list = []
+        self.undo: list | None = None
+        self.undo_changes: tuple = (set(), set(), [])
+        self.id_allocator = IdAllocator()
 
     def data_from_csv(self) -> list:
         """
-        Read data from CSV file and convert to a list of dictionaries
+        Read data from CSV file (or the SQLite database) and convert to a list of dictionaries
         and with self.get_objects() to objects.
+        The file is read with the shared lock, so it is never read while another program writes it.
+        With the journal storage, the changes of the journal are applied to the rows of the CSV file.
+        If the file has not changed since it was last loaded by any instance,
+        the cached data and objects are used instead of parsing the file again.
+        Otherwise the rows are read from the binary snapshot if it was made from this version
+        of the file, or parsed from the file and the snapshot is written.
+        The text index is read from its file the same way, or built from the objects and written.
         Returns:
             list: List of dictionaries containing CSV data
         Raises:
             ValueError: If a file is empty or doesn't exist
         """
-        data = []
-        if os.path.exists(self.path_file):
-            if os.path.getsize(self.path_file):
-                with open(self.path_file, "r") as file:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        data.append(row)
-                self.data = data
-                self.get_objects()
-                return data
-            else:
+        with self.lock.shared():
+            return self.read_data()
+
+    def read_data(self) -> list:
+        """
+        Read the data for self.data_from_csv(), with the lock held.
+        Returns:
+            list: List of dictionaries containing CSV data
+        Raises:
+            ValueError: If a file is empty or doesn't exist
+        """
+        signature = self.file_signature()
+        if signature is None:
+            raise ValueError(
+                f"⚠️  The file for your {self.data_type}s does not exist. Choose option 3 to add some ⚠️"
+            )
+        cached = Data.cache.get(self.cache_key())
+        if cached and cached["signature"] == signature:
+            Data.cache_hits += 1
+            self.data = cached["data"]
+            self.objects = cached["objects"]
+            self.index = cached["index"]
+            self.property_index = cached["property_index"]
+            self.sorted_index = cached["sorted_index"]
+            self.text_index = cached["text_index"]
+            self.due_index = cached["due_index"]
+            self.report = cached["report"]
+            self.id_allocator = cached["id_allocator"]
+            self.signature = signature
+            self.changed = set()
+            self.deleted = set()
+            self.appended = []
+            if self.undo is not None:
+                self.begin()
+            if not self.data:
+                # the last rows were deleted since the file was loaded
                 raise ValueError(
                     f"⚠️  The file for your {self.data_type}s is empty. Choose option 3 to add some ⚠️"
                 )
-        else:
-            raise ValueError(
-                f"⚠️  The file for your {self.data_type}s does not exist. Choose option 3 to add some ⚠️"
+            return self.data
+        Data.cache_misses += 1
+        with paused_gc():
+            snapshot = (
+                read_snapshot(self.snapshot, signature) if self.snapshot else None
             )
+            from_snapshot = snapshot is not None
+            if snapshot is not None:
+                data, indexes = snapshot
+            else:
+                data, indexes = list(self.iter_rows()), None
+            if data:
+                self.data = data
+                self.get_objects(indexes)
+                self.signature = signature
+                self.remember()
+                if not from_snapshot:
+                    self.write_snapshot()
+                if self.undo is not None:
+                    # record the changes from the loaded objects
+                    self.begin()
+                return data
+        raise ValueError(
+            f"⚠️  The file for your {self.data_type}s is empty. Choose option 3 to add some ⚠️"
+        )
 
     def data_to_csv(
         self,
     ) -> None:
         """
-        Write data to CSV file.
+        Write data to CSV file (or replace all the rows of the SQLite table).
+        The file is written to a temporary file renamed over the CSV file,
+        so an interrupted write never leaves a truncated file.
+        The file is written with the exclusive lock, without checking its version.
+        The cached state of the file is dropped, use self.save() to write the objects and keep it.
+        Raises:
+            ValueError: If no data is present to write
+        """
+        with self.lock.exclusive():
+            self.write_data()
+
+    def write_data(self) -> None:
+        """
+        Write self.data for self.data_to_csv(), with the lock held.
         Raises:
             ValueError: If no data is present to write
         """
+        self.forget()
+        if self.sqlite:
+            objects = []
+            for data_dict in self.data:
+                object_ = self.new_object()
+                object_.data_from_dict(data_dict)
+                objects.append(object_)
+            self.sqlite.replace_all(self.data_type, objects)
+            return
+        os.replace(self.write_temp_csv(), self.path_file)
+        # self.data may not be the loaded objects, their indexes are not written
+        self.write_snapshot(with_indexes=False)
+        if self.journal:
+            # the CSV file contains all the data, the journal changes are not needed anymore
+            self.journal.reset()
+        if not self.data:
+            raise ValueError(f"⚠️  They are no data now in your {self.data_type} ⚠️")
+
+    def write_temp_csv(self) -> str:
+        """
+        Write self.data to a temporary file next to the CSV file, an empty file if there is no data.
+        Returns:
+            str: path of the temporary file, to rename over the CSV file with os.replace()
+        """
         if not os.path.exists("DB"):
             os.makedirs("./DB")
-        with open(self.path_file, "w", newline="") as file:
+        temp_file = self.path_file + ".tmp"
+        with open(temp_file, "w", newline="") as file:
             if self.data:
                 fieldnames = list(self.data[0].keys())
                 writer = csv.DictWriter(file, fieldnames=fieldnames)
-                if not os.path.getsize(self.path_file):
-                    writer.writeheader()
+                writer.writeheader()
                 for row in self.data:
-                    writer.writerow(row)
+                    writer.writerow(csv_row(row))
+            file.flush()
+            os.fsync(file.fileno())
+        return temp_file
+
+    def append_row(self, row: dict) -> None:
+        """
+        Append a single row to the CSV file without rewriting the existing rows.
+        Args:
+            row (dict): dictionary containing all keys of the object's attributes
+        """
+        self.append_rows([row])
+
+    def append_rows(self, rows: list) -> None:
+        """
+        Append rows to the CSV file in one write, without rewriting the existing rows.
+        The header is written only when the file is new or empty,
+        otherwise the columns follow the header already in the file.
+        With the SQLite storage, the rows are inserted in the table in one transaction,
+        with the journal storage, they are appended to the journal.
+        Args:
+            rows (list[dict]): dictionaries containing all keys of the object's attributes
+        """
+        if not rows:
+            return
+        with self.lock.exclusive():
+            self.write_rows(rows)
+        if self.journal:
+            self.journal.commit()
+
+    def write_rows(self, rows: list) -> None:
+        """
+        Append the rows for self.append_rows(), with the lock held.
+        Args:
+            rows (list[dict]): dictionaries containing all keys of the object's attributes
+        """
+        old_signature = self.file_signature()
+        in_sync = self.signature == old_signature and all(
+            row["id"] in self.index for row in rows
+        )
+        if self.journal:
+            self.journal.append([{"op": "put", "row": row} for row in rows])
+        elif self.sqlite:
+            objects = []
+            for row in rows:
+                object_ = self.index.get(row["id"])
+                if object_ is None:
+                    object_ = self.new_object()
+                    object_.data_from_dict(row)
+                objects.append(object_)
+            self.sqlite.save(self.data_type, objects)
+        else:
+            if not os.path.exists("DB"):
+                os.makedirs("./DB")
+            fieldnames = list(rows[0].keys())
+            new_file = not os.path.exists(self.path_file) or not os.path.getsize(
+                self.path_file
+            )
+            missing_new_line = False
+            if not new_file:
+                with open(self.path_file, "r", newline="") as file:
+                    fieldnames = next(csv.reader(file))
+                with open(self.path_file, "rb") as file:
+                    # a file edited by hand may not end with a new line
+                    file.seek(-1, os.SEEK_END)
+                    missing_new_line = file.read(1) not in [b"\n", b"\r"]
+            with open(self.path_file, "a", newline="") as file:
+                writer = csv.DictWriter(file, fieldnames=fieldnames)
+                if new_file:
+                    writer.writeheader()
+                elif missing_new_line:
+                    file.write("\r\n")
+                for row in rows:
+                    writer.writerow(csv_row(row))
+            signature = self.file_signature()
+            if self.snapshot and old_signature and signature:
+                # the snapshot made from the file before the append gets the new rows
+                append_snapshot(
+                    self.snapshot,
+                    old_signature,
+                    signature,
+                    self.new_object().fields,
+                    rows,
+                )
+        self.changed.difference_update(row["id"] for row in rows)
+        if in_sync:
+            # the rows were already added to the objects with self.add_object()
+            self.signature = self.file_signature()
+            self.remember()
+        else:
+            self.forget()
+
+    def save(self) -> None:
+        """
+        Write the objects to the CSV file and keep them in the cache for the new file version.
+        If objects were only added since the file was loaded, their rows are appended to the file,
+        otherwise the whole file is rewritten.
+        With the SQLite storage, only the rows of the objects changed or deleted
+        since the last save are updated or deleted.
+        With the journal storage, the changes are appended to the journal.
+        The file is written with the exclusive lock, after checking that no other program
+        changed it since it was loaded.
+        Raises:
+            StaleDataError: If the file was changed by another program since it was loaded
+            ValueError: If no data is present to write
+        """
+        with self.lock.exclusive():
+            self.check_version()
+            self.write_changes()
+        if self.journal:
+            # without the lock, the saves of the other threads can share the fsync
+            self.journal.commit()
+
+    def write_changes(self) -> None:
+        """
+        Write the changes for self.save(), with the lock held.
+        Raises:
+            ValueError: If no data is present to write
+        """
+        if self.journal:
+            data_type, changed, deleted = self.pending_changes()
+            # the new objects are written in the order they were added, like in the csv file
+            order = {id_: position for position, id_ in enumerate(self.appended)}
+            changed.sort(key=lambda object_: order.get(object_.id, -1))
+            records = [{"op": "delete", "id": id_} for id_ in deleted]
+            records += [
+                {"op": "put", "row": object_.convert_to_dict()} for object_ in changed
+            ]
+            self.forget()
+            self.journal.append(records)
+            if self.journal.count >= self.journal_compact_threshold:
+                self.compact()
             else:
-                raise ValueError(f"⚠️  They are no data now in your {self.data_type} ⚠️")
+                self.saved()
+        elif self.sqlite:
+            self.set_objects()
+            self.forget()
+            self.sqlite.save(*self.pending_changes())
+            self.saved()
+        elif self.can_append():
+            self.append_rows(
+                [self.index[id_].convert_to_dict() for id_ in self.appended]
+            )
+            self.saved()
+        else:
+            self.set_objects()
+            self.forget()
+            os.replace(self.write_temp_csv(), self.path_file)
+            self.saved()
+            self.write_snapshot()
+            self.write_text_index()
+            if not self.data:
+                raise ValueError(
+                    f"⚠️  They are no data now in your {self.data_type} ⚠️"
+                )
+
+    def check_version(self) -> None:
+        """
+        Optimistic concurrency check: the file must be the version loaded in memory,
+        otherwise writing the objects would overwrite the changes of another program.
+        Nothing is checked for the SQLite storage, which only writes the rows changed.
+        Raises:
+            StaleDataError: If the file was changed by another program since it was loaded
+        """
+        if not self.sqlite and self.file_signature() != self.signature:
+            self.forget()
+            raise StaleDataError(
+                f"⚠️  Your {self.data_type}s were changed by another user since they were loaded, nothing was saved. Try again ⚠️"
+            )
+
+    def compact(self) -> None:
+        """
+        Rewrite the CSV file with the objects, then empty the journal.
+        If the program stops between the two, the journal changes are applied again
+        to the new CSV file at the next loading, which gives the same data.
+        """
+        self.set_objects()
+        self.forget()
+        os.replace(self.write_temp_csv(), self.path_file)
+        if self.journal:
+            self.journal.reset()
+        self.saved()
+        self.write_text_index()
+
+    def write_snapshot(self, with_indexes=True) -> None:
+        """
+        Write the binary snapshot of self.data for the current version of the CSV file,
+        self.data must contain all the rows of the file.
+        Args:
+            with_indexes (bool): True to write the indexes of the objects with the rows,
+                the objects must be the ones of self.data
+        """
+        signature = file_signature(self.path_file)
+        if self.snapshot and signature:
+            write_snapshot(
+                self.snapshot,
+                signature,
+                self.new_object().fields,
+                self.data,
+                self.snapshot_indexes() if with_indexes else None,
+            )
+
+    def snapshot_indexes(self) -> dict:
+        """
+        Returns:
+            dict: self.property_index, self.sorted_index and self.due_index, to write in the snapshot,
+                with the settings they were built for
+        """
+        return {
+            "settings": self.index_settings(),
+            "property_index": self.property_index,
+            "sorted_index": self.sorted_index,
+            "due_index": self.due_index,
+        }
+
+    def load_text_index(self) -> TextIndex:
+        """
+        Give self.text_index, read from its file or built from the objects the first time
+        it is needed (by self.search()), so loading the objects doesn't pay for it.
+        Then it is kept up to date by the changes and kept in the cache with the objects.
+        Returns:
+            TextIndex: the text index of the objects
+        """
+        if self.text_index is not None:
+            return self.text_index
+        unchanged = not self.changed and not self.deleted
+        text_index = None
+        if self.words and self.signature and unchanged:
+            text_index = TextIndex.read(self.words, self.signature)
+        built = text_index is None
+        if text_index is None:
+            text_index = TextIndex()
+            for object_ in self.objects:
+                for property_ in self.text_properties:
+                    text_index.add(object_.id, getattr(object_, property_))
+        self.text_index = text_index
+        if built and unchanged:
+            # read back by the next loadings of this version of the file
+            self.write_text_index()
+        cached = Data.cache.get(self.cache_key())
+        if cached and cached["objects"] is self.objects:
+            cached["text_index"] = text_index
+        return text_index
+
+    def write_text_index(self) -> None:
+        """
+        Write the text index for the current version of the file,
+        only if the objects are the ones of this version.
+        """
+        signature = self.file_signature()
+        if self.words and signature and signature == self.signature and self.text_index:
+            self.text_index.write(self.words, signature)
+
+    def can_append(self) -> bool:
+        """
+        Returns:
+            bool: True if the only changes since the file was loaded are added objects,
+                so the file can be updated by appending their rows
+        """
+        return (
+            not self.deleted
+            and self.changed <= set(self.appended)
+            and self.signature == self.file_signature()
+        )
+
+    def pending_changes(self) -> tuple:
+        """
+        Returns:
+            tuple: (data type, objects changed, ids deleted) since the last save,
+                the arguments of SqliteStorage.save()
+        """
+        changed = [self.index[id_] for id_ in self.changed if id_ in self.index]
+        return self.data_type, changed, set(self.deleted)
+
+    def saved(self) -> None:
+        """
+        Mark all the changes as saved, and keep the state in the cache for the new file version.
+        """
+        self.changed = set()
+        self.deleted = set()
+        self.appended = []
+        self.signature = self.file_signature()
+        self.remember()
+
+    def begin(self) -> None:
+        """
+        Start recording the changes of the objects, to be able to undo them with self.rollback().
+        """
+        self.undo = []
+        self.undo_changes = (set(self.changed), set(self.deleted), list(self.appended))
+
+    def end(self) -> None:
+        """
+        Stop recording the changes of the objects.
+        """
+        self.undo = None
+
+    def rollback(self) -> None:
+        """
+        Undo in memory all the changes recorded since self.begin().
+        """
+        undo = self.undo or []
+        self.undo = None
+        for change in reversed(undo):
+            if change[0] == "update":
+                _, object_, property_, value = change
+                self.update_object(object_, property_, value)
+            elif change[0] == "add":
+                _, object_, data_dict = change
+                self.delete_object(object_)
+                if data_dict in self.data:
+                    self.data.remove(data_dict)
+            elif change[0] == "delete":
+                _, object_, position = change
+                self.objects.insert(position, object_)
+                self.index_object(object_)
+                self.id_allocator.reserve(int(object_.id))
+        self.changed, self.deleted, self.appended = self.undo_changes
+
+    def clear(self) -> None:
+        """
+        Empty the data and the objects, used when the file doesn't exist or is empty.
+        """
+        self.data = []
+        self.objects = []
+        self.index = {}
+        self.property_index = {property_: {} for property_ in self.indexed_properties}
+        self.sorted_index = {property_: [] for property_ in self.sorted_properties}
+        self.text_index = TextIndex()
+        self.due_index = []
+        self.report = None
+        # the empty data is the current version of the file
+        self.signature = self.file_signature()
+        self.changed = set()
+        self.deleted = set()
+        self.appended = []
+        self.id_allocator = IdAllocator()
+
+    def source_file(self) -> str:
+        """
+        Returns:
+            str: the file containing the data, the csv file or the SQLite database
+        """
+        return self.sqlite.database if self.sqlite else self.path_file
+
+    def cache_key(self) -> tuple:
+        """
+        Returns:
+            tuple: key of the state of this data in the cache (file absolute path, data type)
+        """
+        return os.path.abspath(self.source_file()), self.data_type
+
+    def file_signature(self) -> tuple | None:
+        """
+        Identify the version of the file.
+        Returns:
+            tuple | None: (mtime, size, inode) of the file, None if it doesn't exist
+                with the journal storage, the signatures of the CSV file and of the journal
+        """
+        signature = file_signature(self.source_file())
+        if self.journal:
+            journal_signature = file_signature(self.journal.path)
+            if signature is None and journal_signature is None:
+                return None
+            return signature, journal_signature
+        return signature
+
+    def file_size(self) -> int:
+        """
+        Returns:
+            int: size in bytes of the file, and of the journal with the journal storage
+        """
+        size = 0
+        for path in [self.source_file()] + (
+            [self.journal.path] if self.journal else []
+        ):
+            if os.path.exists(path):
+                size += os.path.getsize(path)
+        return size
+
+    def remember(self) -> None:
+        """
+        Store the current state in the cache shared by all instances for self.signature.
+        """
+        Data.cache[self.cache_key()] = {
+            "signature": self.signature,
+            "data": self.data,
+            "objects": self.objects,
+            "index": self.index,
+            "property_index": self.property_index,
+            "sorted_index": self.sorted_index,
+            "text_index": self.text_index,
+            "due_index": self.due_index,
+            "report": self.report,
+            "id_allocator": self.id_allocator,
+        }
+
+    def forget(self) -> None:
+        """
+        Drop the cached state of the file, the next data_from_csv() parse it again.
+        """
+        Data.cache.pop(self.cache_key(), None)
+        self.signature = None
+
+    def load_or_stream(self) -> bool:
+        """
+        Load the data in memory with self.data_from_csv(), unless the file is bigger than
+        stream_threshold and is not already loaded.
+        Returns:
+            bool: True if the objects are loaded, False if the file must be streamed
+        Raises:
+            ValueError: If a file is empty or doesn't exist
+        """
+        signature = self.file_signature()
+        if signature is not None and signature == self.signature:
+            return True
+        cached = Data.cache.get(self.cache_key())
+        if (
+            signature is None
+            or self.file_size() <= self.stream_threshold
+            or (cached and cached["signature"] == signature)
+        ):
+            self.data_from_csv()
+            return True
+        return False
+
+    def iter_rows(self):
+        """
+        Yield the rows of the file one at a time, without reading the whole file in memory.
+        Yields:
+            dict: dictionary containing the row data
+        """
+        if self.sqlite:
+            yield from self.sqlite.iter_rows(self.data_type)
+        elif self.journal:
+            yield from replay(self.iter_csv_rows(), self.journal.read())
+        else:
+            yield from self.iter_csv_rows()
+
+    def iter_csv_rows(self):
+        """
+        Yield the rows of the CSV file one at a time, nothing if the file doesn't exist.
+        Yields:
+            dict: dictionary containing the row data
+        """
+        if os.path.exists(self.path_file):
+            with open(self.path_file, "r") as file:
+                for row in csv.DictReader(file):
+                    yield row_from_csv(row)
+
+    def iter_objects(self, filter_=None):
+        """
+        Yield the objects one at a time, from memory if they are loaded,
+        otherwise converted from the file row by row so a big file is never fully in memory.
+        The loop can be stopped as soon as the wanted objects are found.
+        Args:
+            filter_ (Callable[[DataType], bool] | None): only yield the objects for which filter_ is True
+        Yields:
+            DataType: Project or Task object
+        Raises:
+            ValueError: If a file is empty or doesn't exist
+        """
+        if self.load_or_stream():
+            for object_ in self.objects:
+                if filter_ is None or filter_(object_):
+                    yield object_
+            return
+        for row in self.iter_rows():
+            object_ = self.new_object()
+            object_.data_from_dict(row)
+            if filter_ is None or filter_(object_):
+                yield object_
+
+    def iter_objects_by_property_value(self, property_, value):
+        """
+        Yield the objects having a property equal to value (or a list property containing value),
+        with self.property_index if the objects are loaded.
+        Args:
+            property_ (str): Name of the property to search
+            value (str): Value of the property to match
+        Yields:
+            DataType: Object with matching property value
+        """
+        if self.load_or_stream():
+            yield from self.get_objects_by_property_value(property_, value)
+        else:
+            yield from self.iter_objects(
+                lambda object_: value in property_values(getattr(object_, property_))
+            )
+
+    def find_object(self, id_: str) -> DataType:
+        """
+        Retrieve an object by its ID, with self.index if the objects are loaded,
+        otherwise by reading only its row with the offset index of the CSV file (with the shared lock)
+        (or by reading the database until the object is found).
+        Args:
+            id_ (str): ID of the object to retrieve
+        Returns:
+            DataType: Object with the specified ID
+        Raises:
+            ValueError: If no object with the given ID exists, or the file is empty or doesn't exist
+        """
+        if self.load_or_stream():
+            return self.get_object(id_)
+        if self.offsets:
+            # the file is not written by another program while its index is built or its row is read
+            with self.lock.shared():
+                signature = self.file_signature()
+                row = self.offsets.read_row(signature, id_) if signature else None
+            if row is not None:
+                object_ = self.new_object()
+                object_.data_from_dict(row_from_csv(row))
+                return object_
+        else:
+            for object_ in self.iter_objects(lambda object_: object_.id == id_):
+                return object_
+        raise ValueError(f"⚠️  No {self.data_type} with this ID ⚠️")
 
     def get_all_ids(self) -> list:
         """
-        Get all IDs from the data.
+        Get all IDs from the objects.
         Convert it to int so we can use it to create new unique id
         Returns:
             list[int]: List of all object IDs
         """
-        return [int(data["id"]) for data in self.data]
+        return [int(id_) for id_ in self.index]
+
+    def new_id(self) -> str:
+        """
+        Give the lowest id not used by an object, so the ids of deleted objects are reused.
+        The id is reserved when the object is added with self.add_object().
+        Returns:
+            str: A new unique ID
+        """
+        return str(self.id_allocator.peek())
+
+    def new_ids(self, count: int) -> list:
+        """
+        Give count ids not used by an object, for adding many objects at once.
+        The ids are reserved now, a rollback of the objects added with them releases them.
+        Args:
+            count (int): number of ids
+        Returns:
+            list[str]: new unique IDs, in increasing order
+        """
+        return [str(id_) for id_ in self.id_allocator.allocate_many(count)]
 
     def get_object(self, id_: str) -> DataType:
         """
@@ -100,14 +853,15 @@ class Data:
         Raises:
             ValueError: If no object with the given ID exists
         """
-        for object_ in self.objects:
-            if object_.id == id_:
-                return object_
-        raise ValueError(f"⚠️  No {self.data_type} with this ID ⚠️")
+        try:
+            return self.index[id_]
+        except KeyError:
+            raise ValueError(f"⚠️  No {self.data_type} with this ID ⚠️")
 
     def get_object_by_property_value(self, property_, value) -> DataType:
         """
-        Retrieve an object by a specific property (hasattr) value (getattr).
+        Retrieve the first object having a specific property (hasattr) equal to value (getattr).
+        For a list property, the object match if the list contain value.
         Args:
             property_ (str): Name of the property to search
             value (str): Value of the property to match
@@ -116,11 +870,273 @@ class Data:
         Raises:
             ValueError: If no object with the given property value exists
         """
+        objects = self.get_objects_by_property_value(property_, value)
+        if objects:
+            return objects[0]
+        raise ValueError(f"⚠️  No {self.data_type} with {property_} = {value}⚠️")
+
+    def get_objects_by_property_value(self, property_, value) -> list:
+        """
+        Retrieve all objects having a specific property equal to value (exact match).
+        For a list property, the object match if the list contain value.
+        Indexed properties (self.indexed_properties) are resolved with self.property_index,
+        other properties with a scan of self.objects.
+        Args:
+            property_ (str): Name of the property to search
+            value (str): Value of the property to match
+        Returns:
+            list[DataType]: Objects with matching property value, empty if there is none
+        """
+        if property_ in self.property_index:
+            ids = self.property_index[property_].get(value, ())
+            return [self.index[id_] for id_ in ids]
+        objects = []
         for object_ in self.objects:
             if hasattr(object_, property_):
-                if value in getattr(object_, property_):
-                    return object_
-        raise ValueError(f"⚠️  No {self.data_type} with {property_} = {value}⚠️")
+                if value in property_values(getattr(object_, property_)):
+                    objects.append(object_)
+        return objects
+
+    def query(
+        self, deadline_between=None, order_by=None, limit=None, **properties
+    ) -> list:
+        """
+        Find the objects matching all the conditions with the indexes instead of a scan:
+        the indexed properties (ie: state, linked_project) with self.property_index,
+        the deadline range and the order by deadline with self.sorted_index.
+        The other properties are only compared on the objects matching the indexed conditions.
+        Args:
+            deadline_between (tuple[str | None, str | None] | None): first and last deadline
+                (YYYY-MM-DD, included), None for no limit on this side
+            order_by (str | None): property to sort on, "-" before it for a descending order
+                (ie: "deadline", "-deadline", "name"), the objects are sorted by ID if None
+            limit (int | None): maximum number of objects
+            **properties: values the objects must have, ie: state="In progress", linked_project="1"
+        Returns:
+            list[DataType]: the matching objects
+        Raises:
+            ValueError: If a property doesn't exist
+        """
+        fields = self.new_object().fields
+        sort_property = order_by.lstrip("-") if order_by else None
+        for property_ in list(properties) + ([sort_property] if sort_property else []):
+            if property_ not in fields:
+                raise ValueError(
+                    f"🔴  The property '{property_}' does not exist in the {self.data_type} 🔴"
+                )
+        descending = bool(order_by) and order_by.startswith("-")
+
+        # ids matching the indexed properties, starting with the smallest set
+        indexed = [
+            self.property_index[property_].get(value, set())
+            for property_, value in properties.items()
+            if property_ in self.property_index
+        ]
+        ids = None
+        for matching in sorted(indexed, key=len):
+            ids = set(matching) if ids is None else ids & matching
+        others = {
+            property_: value
+            for property_, value in properties.items()
+            if property_ not in self.property_index
+        }
+
+        deadlines = self.sorted_index["deadline"]
+        first, last = deadline_between or (None, None)
+        start = 0 if first is None else bisect_left(deadlines, (first,))
+        end = (
+            len(deadlines)
+            if last is None
+            else bisect_right(deadlines, (last, float("inf")))
+        )
+        by_deadline = sort_property == "deadline" or (
+            deadline_between is not None and (ids is None or end - start <= len(ids))
+        )
+        if by_deadline:
+            # walk the deadline index in order, stopped at limit when the order is the deadline
+            entries = deadlines[start:end]
+            if descending:
+                entries = reversed(entries)
+            candidates: Iterator = (self.index[str(id_)] for _, id_ in entries)
+            if ids is not None:
+                candidates = (object_ for object_ in candidates if object_.id in ids)
+        else:
+            if ids is None:
+                candidates = iter(
+                    sorted(self.objects, key=lambda object_: int(object_.id))
+                )
+            else:
+                candidates = (self.index[id_] for id_ in sorted(ids, key=int))
+            if deadline_between is not None:
+                candidates = (
+                    object_
+                    for object_ in candidates
+                    if (first is None or first <= object_.deadline)
+                    and (last is None or object_.deadline <= last)
+                )
+        if others:
+            candidates = (
+                object_
+                for object_ in candidates
+                if all(
+                    value in property_values(getattr(object_, property_))
+                    for property_, value in others.items()
+                )
+            )
+
+        if sort_property and sort_property != "deadline":
+            key = lambda object_: (getattr(object_, sort_property), int(object_.id))
+            if limit is not None:
+                select = heapq.nlargest if descending else heapq.nsmallest
+                return select(limit, candidates, key=key)
+            return sorted(candidates, key=key, reverse=descending)
+        if by_deadline and not sort_property:
+            return sorted(candidates, key=lambda object_: int(object_.id))[:limit]
+        return list(islice(candidates, limit))
+
+    def search(self, text: str, any_word=False, limit=None) -> list:
+        """
+        Find the objects containing words in their text properties (self.text_properties)
+        with self.text_index, the most relevant first.
+        Args:
+            text (str): words to find, the case doesn't matter
+            any_word (bool): True for the objects containing any of the words (OR),
+                False for the objects containing all of them (AND)
+            limit (int | None): maximum number of objects
+        Returns:
+            list[DataType]: the objects found, empty if there is none
+        """
+        results = self.load_text_index().search(text, any_word, len(self.index), limit)
+        return [self.index[id_] for id_, _ in results]
+
+    def due(self, days=None, overdue=True, limit=None, today=None) -> list:
+        """
+        Find the objects not finished (state not in self.closed_states) by urgency with self.due_index:
+        the overdue objects (deadline before today) and the objects due in the next days.
+        Only the objects returned are read from the index, not all the objects.
+        Args:
+            days (int | None): number of days after today, None for the overdue objects only
+            overdue (bool): False to leave out the overdue objects
+            limit (int | None): maximum number of objects
+            today (date | None): date of today, date.today() if None
+        Returns:
+            list[DataType]: the objects found, the earliest deadline first
+        """
+        today = today or date.today()
+        # None only while the objects are created
+        due_index = self.due_index or []
+        start = 0 if overdue else bisect_left(due_index, (today.isoformat(),))
+        if days is None:
+            end = bisect_left(due_index, (today.isoformat(),))
+        else:
+            last = (today + timedelta(days=days)).isoformat()
+            end = bisect_right(due_index, (last, float("inf")))
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self.index[str(id_)] for _, id_ in due_index[start:end]]
+
+    def due_entry(self, object_) -> tuple | None:
+        """
+        Args:
+            object_ (DataType): Object to index
+        Returns:
+            tuple | None: (deadline, int id) of the object in self.due_index, None if it is done
+        """
+        if is_closed(object_.state, self.closed_states):
+            return None
+        return str(object_.deadline), int(object_.id)
+
+    def update_object(self, object_, property_, value) -> None:
+        """
+        Set the property of an object and keep self.property_index, self.sorted_index,
+        self.text_index, self.due_index and self.report up to date.
+        Lists must be replaced by a new list, not modified in place, to be re-indexed.
+        Args:
+            object_ (DataType): Object to update
+            property_ (str): Name of the property to update
+            value: New value of the property
+        """
+        old_value = getattr(object_, property_)
+        if self.undo is not None:
+            self.undo.append(("update", object_, property_, old_value))
+        due_entry = self.due_entry(object_)
+        report = self.report if property_ in ProjectReport.properties else None
+        if report is not None:
+            report.remove(object_)
+        setattr(object_, property_, value)
+        if report is not None:
+            report.add(object_)
+        if self.due_index is not None and property_ in ["deadline", "state"]:
+            remove_sorted(self.due_index, due_entry)
+            insort_entry(self.due_index, self.due_entry(object_))
+        if property_ in self.text_properties and self.text_index is not None:
+            self.text_index.remove(object_.id, old_value)
+            self.text_index.add(object_.id, value)
+        values = self.property_index.get(property_)
+        if values is not None:
+            # only the values added or removed are re-indexed, not the whole list
+            old_values = set(property_values(old_value))
+            new_values = set(property_values(value))
+            for item in old_values - new_values:
+                ids = values.get(item)
+                if ids is not None:
+                    ids.discard(object_.id)
+                    if not ids:
+                        del values[item]
+            for item in new_values - old_values:
+                values.setdefault(item, set()).add(object_.id)
+        sorted_values = self.sorted_index.get(property_)
+        if sorted_values is not None:
+            remove_sorted(sorted_values, (str(old_value), int(object_.id)))
+            insort(sorted_values, (str(value), int(object_.id)))
+        self.changed.add(object_.id)
+
+    def index_object(self, object_) -> None:
+        """
+        Add the object to self.index, self.property_index, self.sorted_index, self.text_index,
+        self.due_index and self.report.
+        Args:
+            object_ (DataType): Object to index
+        """
+        self.index[object_.id] = object_
+        for property_, values in self.property_index.items():
+            for value in property_values(getattr(object_, property_)):
+                values.setdefault(value, set()).add(object_.id)
+        for property_, sorted_values in self.sorted_index.items():
+            insort(sorted_values, (str(getattr(object_, property_)), int(object_.id)))
+        if self.text_index is not None:
+            for property_ in self.text_properties:
+                self.text_index.add(object_.id, getattr(object_, property_))
+        if self.due_index is not None:
+            insort_entry(self.due_index, self.due_entry(object_))
+        if self.report is not None:
+            self.report.add(object_)
+
+    def unindex_object(self, object_) -> None:
+        """
+        Remove the object from self.property_index, self.sorted_index, self.text_index,
+        self.due_index and self.report.
+        Args:
+            object_ (DataType): Object to remove from the indexes
+        """
+        for property_, values in self.property_index.items():
+            for value in property_values(getattr(object_, property_)):
+                ids = values.get(value)
+                if ids is not None:
+                    ids.discard(object_.id)
+                    if not ids:
+                        del values[value]
+        for property_, sorted_values in self.sorted_index.items():
+            remove_sorted(
+                sorted_values, (str(getattr(object_, property_)), int(object_.id))
+            )
+        if self.text_index is not None:
+            for property_ in self.text_properties:
+                self.text_index.remove(object_.id, getattr(object_, property_))
+        if self.due_index is not None:
+            remove_sorted(self.due_index, self.due_entry(object_))
+        if self.report is not None:
+            self.report.remove(object_)
 
     def delete_object(self, object_) -> None:
         """
@@ -129,25 +1145,121 @@ class Data:
         Args:
             object_ (DataType): Object to be removed
         """
+        if self.undo is not None:
+            self.undo.append(("delete", object_, self.objects.index(object_)))
         self.objects.remove(object_)
+        self.index.pop(object_.id, None)
+        self.unindex_object(object_)
+        self.changed.discard(object_.id)
+        if object_.id in self.appended:
+            self.appended.remove(object_.id)
+        else:
+            self.deleted.add(object_.id)
+        self.id_allocator.release(int(object_.id))
+
+    def add_object(self, data_dict: dict) -> DataType:
+        """
+        Create an object from a dictionary and add it to self.data, self.objects and self.index.
+        Args:
+            data_dict (dict): dictionary containing all keys of the object's attributes
+        Returns:
+            DataType: The object created
+        """
+        object_ = self.new_object()
+        object_.data_from_dict(data_dict)
+        self.data.append(data_dict)
+        self.objects.append(object_)
+        self.index_object(object_)
+        self.changed.add(object_.id)
+        if object_.id in self.deleted:
+            # the id of an object deleted since the last save is reused, the row is rewritten
+            self.deleted.discard(object_.id)
+        else:
+            self.appended.append(object_.id)
+        self.id_allocator.reserve(int(object_.id))
+        if self.undo is not None:
+            self.undo.append(("add", object_, data_dict))
+        return object_
 
-    def get_objects(self) -> list:
+    def new_object(self) -> DataType:
+        """
+        Create an empty object of the managed data type.
+        Returns:
+            DataType: Project or Task object
+        """
+        if self.data_type == "project":
+            return Project()
+        return Task()
+
+    def index_settings(self) -> tuple:
+        """
+        Returns:
+            tuple: closed states, indexed properties and sorted properties the indexes are built for,
+                the indexes of a snapshot made with other settings are built again
+        """
+        return (
+            tuple(self.closed_states),
+            tuple(self.indexed_properties),
+            tuple(self.sorted_properties),
+        )
+
+    def get_objects(self, indexes=None) -> list:
         """
         Convert dictionary data to objects.
-        Put the object in self.objects
+        Put the object in self.objects and index them in self.index, self.property_index
+        and self.sorted_index and self.due_index (sorted once at the end instead of inserting each object).
+        self.text_index is read or built by self.load_text_index() the first time it is needed.
+        The objects are created from the values of the rows with DataType.from_values(),
+        data_from_dict() is used only for the rows without all the columns.
+        Args:
+            indexes (dict | None): indexes of the data already built, written in the snapshot
+                by self.snapshot_indexes(), built from the objects if None or made for other settings
         Returns:
             list[DataType]: List of created objects
         """
         all_objects = []
+        self.index = {}
+        self.property_index = {property_: {} for property_ in self.indexed_properties}
+        self.sorted_index = {}
+        # built when it is asked, not filled by self.index_object() until then
+        self.text_index = None
+        self.due_index = None
+        # built again from the objects when it is asked
+        self.report = None
+        self.changed = set()
+        self.deleted = set()
+        self.appended = []
         object_: DataType
+        object_type = type(self.new_object())
+        values = itemgetter(*object_type.fields)
         for data_dict in self.data:
-            if self.data_type == "project":
-                object_ = Project()
-            elif self.data_type == "task":
-                object_ = Task()
-            object_.data_from_dict(data_dict)
+            try:
+                object_ = object_type.from_values(values(data_dict))
+            except KeyError:
+                # a row of an old file without a column (ie: linked_project)
+                object_ = self.new_object()
+                object_.data_from_dict(data_dict)
             all_objects.append(object_)
         self.objects = all_objects
+        if indexes is not None and indexes.get("settings") == self.index_settings():
+            self.index = {object_.id: object_ for object_ in all_objects}
+            self.property_index = indexes["property_index"]
+            self.sorted_index = indexes["sorted_index"]
+            self.due_index = indexes["due_index"]
+        else:
+            for object_ in all_objects:
+                self.index_object(object_)
+            self.sorted_index = {
+                property_: sorted(
+                    (str(getattr(object_, property_)), int(object_.id))
+                    for object_ in all_objects
+                )
+                for property_ in self.sorted_properties
+            }
+            self.due_index = sorted(
+                entry for entry in map(self.due_entry, all_objects) if entry is not None
+            )
+        self.id_allocator = IdAllocator(self.get_all_ids())
         return all_objects
 
     def set_objects(self) -> None:
@@ -173,21 +1285,640 @@ class Data:
         return values
 
 
+class StaleDataError(ValueError):
+    """
+    Raised when saving objects loaded from a version of the file changed since by another program.
+    """
+
+
+class Session:
+    """
+    Unit of work grouping the changes of several Data (ie: projects and tasks)
+    made by one operation.
+    Used as `with Session(project_list, task_list):`, the changes made with add_object(),
+    update_object() and delete_object() in the block are written when it ends,
+    each file at most once:
+        - the csv files are first all written to temporary files, then renamed over the csv files,
+        - the SQLite changes are saved in a single transaction,
+        - the changes of the journal storage are appended to the journals.
+    If an exception is raised in the block or while writing the files,
+    the changes are undone in memory and the exception is raised again.
+    A Data already in a Session (ie: a Cascade run in a script) is left to the outer Session,
+    which saves or undoes its changes with the others.
+    Attributes:
+        data_lists (list[Data]): Data whose changes are saved together, None values are ignored
+    """
+
+    def __init__(self, *data_lists):
+        self.data_lists = [
+            data_list for data_list in data_lists if data_list is not None
+        ]
+
+    def __enter__(self):
+        self.data_lists = [
+            data_list for data_list in self.data_lists if data_list.undo is None
+        ]
+        for data_list in self.data_lists:
+            data_list.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        finally:
+            for data_list in self.data_lists:
+                data_list.end()
+
+    def commit(self) -> None:
+        """
+        Write the changes of all the data lists, with the exclusive lock of their files.
+        Raises:
+            StaleDataError: If a file was changed by another program since it was loaded,
+                the changes are undone in memory
+            OSError: If a file can't be written, the changes are undone in memory
+        """
+        touched = [
+            data_list
+            for data_list in self.data_lists
+            if data_list.changed or data_list.deleted
+        ]
+        with ExitStack() as locks:
+            # the files are locked in the same order by all the programs,
+            # so they never wait for each other
+            for data_list in sorted(touched, key=lambda data_list: data_list.lock.path):
+                locks.enter_context(data_list.lock.exclusive())
+            self.write(touched)
+        for data_list in touched:
+            if data_list.journal:
+                # without the locks, the saves of the other threads can share the fsync
+                data_list.journal.commit()
+
+    def write(self, touched: list) -> None:
+        """
+        Write the changes for self.commit(), with the locks held.
+        Args:
+            touched (list[Data]): data lists with changes
+        Raises:
+            StaleDataError: If a file was changed by another program since it was loaded
+            OSError: If a file can't be written, the changes are undone in memory
+        """
+        temp_files: list = []
+        databases: dict = {}
+        try:
+            for data_list in touched:
+                data_list.check_version()
+            for data_list in touched:
+                if data_list.journal:
+                    # the changes are appended to the journal when all the files are written
+                    continue
+                if data_list.sqlite:
+                    data_list.set_objects()
+                    data_list.forget()
+                    databases.setdefault(
+                        data_list.sqlite.database, (data_list.sqlite, [])
+                    )[1].append(data_list.pending_changes())
+                elif not data_list.can_append():
+                    data_list.set_objects()
+                    temp_files.append((data_list, data_list.write_temp_csv()))
+            for sqlite, changes in databases.values():
+                sqlite.save_many(changes)
+        except Exception:
+            for _, temp_file in temp_files:
+                os.remove(temp_file)
+            self.rollback()
+            raise
+        try:
+            for data_list in touched:
+                if data_list.sqlite:
+                    data_list.saved()
+                elif data_list.journal or data_list.can_append():
+                    # the versions were checked with the locks held
+                    data_list.write_changes()
+            for data_list, temp_file in temp_files:
+                data_list.forget()
+                os.replace(temp_file, data_list.path_file)
+                data_list.saved()
+                data_list.write_snapshot()
+                data_list.write_text_index()
+        except Exception:
+            # some files may be written, they will be read again
+            self.rollback()
+            for data_list in touched:
+                data_list.forget()
+            raise
+
+    def rollback(self) -> None:
+        """
+        Undo in memory the changes of all the data lists.
+        """
+        for data_list in self.data_lists:
+            data_list.rollback()
+
+
+class IdAllocator:
+    """
+    Allocate the lowest positive id not used, to reuse the ids of deleted objects.
+    The free ids below the highest id used are kept in a heap,
+    so getting or reserving an id doesn't need to scan all the ids.
+    Attributes:
+        next_id (int): the lowest id above all the ids used
+        free (list[int]): heap of the free ids lower than next_id, it can contain ids reserved since
+        free_ids (set[int]): the free ids lower than next_id
+    """
+
+    def __init__(self, ids=()):
+        """
+        Args:
+            ids (Iterable[int]): ids already used
+        """
+        used = set(ids)
+        self.next_id = max(used) + 1 if used else 1
+        # a sorted list is a valid heap
+        self.free = [id_ for id_ in range(1, self.next_id) if id_ not in used]
+        self.free_ids = set(self.free)
+
+    def peek(self) -> int:
+        """
+        Returns:
+            int: the lowest id not used, without reserving it
+        """
+        while self.free and self.free[0] not in self.free_ids:
+            heapq.heappop(self.free)
+        return self.free[0] if self.free else self.next_id
+
+    def reserve(self, id_: int) -> None:
+        """
+        Mark an id as used.
+        Args:
+            id_ (int): id of a new object
+        """
+        if id_ >= self.next_id:
+            for free_id in range(self.next_id, id_):
+                heapq.heappush(self.free, free_id)
+                self.free_ids.add(free_id)
+            self.next_id = id_ + 1
+        else:
+            self.free_ids.discard(id_)
+
+    def allocate(self) -> int:
+        """
+        Returns:
+            int: the lowest id not used, reserved
+        """
+        id_ = self.peek()
+        self.reserve(id_)
+        return id_
+
+    def allocate_many(self, count: int) -> list:
+        """
+        Args:
+            count (int): number of ids
+        Returns:
+            list[int]: the count lowest ids not used, reserved
+        """
+        ids: list[int] = []
+        while len(ids) < count and self.peek() != self.next_id:
+            id_ = heapq.heappop(self.free)
+            self.free_ids.discard(id_)
+            ids.append(id_)
+        start = self.next_id
+        self.next_id += count - len(ids)
+        ids.extend(range(start, self.next_id))
+        return ids
+
+    def release(self, id_: int) -> None:
+        """
+        Mark the id of a deleted object as free.
+        Args:
+            id_ (int): id of the deleted object
+        """
+        if id_ < self.next_id and id_ not in self.free_ids:
+            self.free_ids.add(id_)
+            heapq.heappush(self.free, id_)
+
+
+class Cascade:
+    """
+    Delete projects or tasks and update the related objects referencing them:
+    the tasks linked to a deleted project are unlinked,
+    a deleted task is removed from the task_list of its projects.
+    The related objects are found with the property indexes and each one is updated once,
+    then all the changes are saved in a Session, so each file is written once.
+    Attributes:
+        data_list (Data): Projects or Tasks to delete from
+        related (Data | None): Tasks or Projects referencing the deleted objects
+    """
+
+    # property of the related objects referencing the deleted objects, by data_type
+    related_properties = {"project": "linked_project", "task": "task_list"}
+
+    def __init__(self, data_list: Data, related: Data | None = None):
+        self.data_list = data_list
+        self.related = related
+
+    def delete(self, ids=None, filter_=None) -> list:
+        """
+        Delete the objects with the given ids and/or matching filter_,
+        and update the related objects.
+        Args:
+            ids (Iterable[str] | None): ids of the objects to delete, None for all the objects
+            filter_ (Callable[[DataType], bool] | None): only delete the objects
+                for which filter_ is True
+        Returns:
+            list[str]: ids of the deleted objects
+        Raises:
+            ValueError: If the file is empty or doesn't exist, or if an id is not found
+        """
+        if not self.data_list.index:
+            self.data_list.data_from_csv()
+        if ids is None:
+            objects = list(self.data_list.objects)
+        else:
+            objects = [
+                self.data_list.get_object(str(id_)) for id_ in dict.fromkeys(ids)
+            ]
+        if filter_ is not None:
+            objects = [object_ for object_ in objects if filter_(object_)]
+        if not objects:
+            return []
+        with Session(self.data_list, self.related):
+            for object_ in objects:
+                self.data_list.delete_object(object_)
+            self.unlink({object_.id for object_ in objects})
+        return [object_.id for object_ in objects]
+
+    def unlink(self, ids: set) -> None:
+        """
+        Remove the deleted ids from the related objects.
+        The related objects are only loaded if one reading of their file finds a reference.
+        Args:
+            ids (set[str]): ids of the deleted objects
+        """
+        if self.related is None:
+            return
+        property_ = self.related_properties[self.data_list.data_type]
+        try:
+            if not self.related.index:
+                if not any(
+                    self.related.iter_objects(
+                        lambda object_: not ids.isdisjoint(
+                            property_values(getattr(object_, property_))
+                        )
+                    )
+                ):
+                    return
+                self.related.data_from_csv()
+        except ValueError:
+            # the file of the related objects is empty or doesn't exist
+            return
+        related_ids = set()
+        for id_ in ids:
+            related_ids.update(self.related.property_index[property_].get(id_, ()))
+        for related_id in sorted(related_ids, key=int):
+            object_ = self.related.index[related_id]
+            value = getattr(object_, property_)
+            if isinstance(value, list):
+                value = [item for item in value if item not in ids]
+            else:
+                value = ""
+            self.related.update_object(object_, property_, value)
+
+
+def file_signature(path: str) -> tuple | None:
+    """
+    Identify the version of a file.
+    Args:
+        path (str): Path to the file
+    Returns:
+        tuple | None: (mtime, size, inode) of the file, None if it doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class ProjectReport:
+    """
+    Progress and workload of the projects from their linked tasks: the number of tasks by state,
+    and the deadlines of the tasks not finished to count the overdue tasks
+    and find the next deadline at any date.
+    It is computed in one pass over the tasks grouped by linked_project,
+    then a task added, deleted or changed only updates the group of its project.
+    Attributes:
+        closed_states (tuple[str]): states of the tasks done, in lower case
+        groups (dict[str, dict]): for each project id ("" for the tasks without project),
+            "states": number of tasks by state,
+            "deadlines": (deadline, int id) of the tasks not finished sorted
+    """
+
+    # properties of a task used by the report
+    properties = ("linked_project", "state", "deadline")
+    # order of the state columns in lower case, the other states follow in alphabetical order
+    states_order = ("to do", "in progress", "completed", "done")
+
+    def __init__(self, tasks=(), closed_states=Data.closed_states):
+        self.closed_states = closed_states
+        self.groups: dict = {}
+        for task in tasks:
+            group = self.group(task.linked_project)
+            group["states"][task.state] = group["states"].get(task.state, 0) + 1
+            if not is_closed(task.state, closed_states):
+                group["deadlines"].append((str(task.deadline), int(task.id)))
+        # sorted once instead of inserting each deadline
+        for group in self.groups.values():
+            group["deadlines"].sort()
+
+    def group(self, project_id: str) -> dict:
+        """
+        Args:
+            project_id (str): id of a project, "" for the tasks without project
+        Returns:
+            dict: the aggregates of the project, created empty if it has no task yet
+        """
+        group = self.groups.get(project_id)
+        if group is None:
+            group = self.groups[project_id] = {"states": {}, "deadlines": []}
+        return group
+
+    def add(self, task: Task) -> None:
+        """
+        Count a task in the group of its project.
+        Args:
+            task (Task): task added or with its new values
+        """
+        group = self.group(task.linked_project)
+        group["states"][task.state] = group["states"].get(task.state, 0) + 1
+        if not is_closed(task.state, self.closed_states):
+            insort(group["deadlines"], (str(task.deadline), int(task.id)))
+
+    def remove(self, task: Task) -> None:
+        """
+        Remove a task counted with self.add() from the group of its project.
+        Args:
+            task (Task): task deleted or with its old values
+        """
+        group = self.groups.get(task.linked_project)
+        if group is None or not group["states"].get(task.state):
+            return
+        group["states"][task.state] -= 1
+        if not group["states"][task.state]:
+            del group["states"][task.state]
+        if not is_closed(task.state, self.closed_states):
+            remove_sorted(group["deadlines"], (str(task.deadline), int(task.id)))
+        if not group["states"]:
+            del self.groups[task.linked_project]
+
+    def rows(self, project_list: "Projects", today: date | None = None) -> list:
+        """
+        Join the aggregates with the projects, without reading the tasks.
+        Args:
+            project_list (Projects): loaded projects
+            today (date | None): date of today, date.today() if None
+        Returns:
+            list[dict]: for each project: id, name, number of tasks, number of tasks by state,
+                number of overdue tasks (not finished) and the next deadline of a task not finished
+        """
+        today_iso = (today or date.today()).isoformat()
+        states = sorted(
+            {state for group in self.groups.values() for state in group["states"]},
+            key=lambda state: (
+                (
+                    self.states_order.index(state.lower())
+                    if state.lower() in self.states_order
+                    else len(self.states_order)
+                ),
+                state.lower(),
+            ),
+        )
+        rows = []
+        for project in sorted(
+            project_list.objects, key=lambda project: int(project.id)
+        ):
+            group = self.groups.get(project.id, {"states": {}, "deadlines": []})
+            overdue = bisect_left(group["deadlines"], (today_iso,))
+            row = {
+                "id": project.id,
+                "name": project.name,
+                "tasks": sum(group["states"].values()),
+            }
+            for state in states:
+                row[state] = group["states"].get(state, 0)
+            row["overdue"] = overdue
+            row["next_deadline"] = (
+                group["deadlines"][overdue][0]
+                if overdue < len(group["deadlines"])
+                else ""
+            )
+            rows.append(row)
+        return rows
+
+
+def is_closed(state: str, closed_states: tuple = CLOSED_STATES) -> bool:
+    """
+    Args:
+        state (str): state of a project or task
+        closed_states (tuple[str]): states of the finished projects and tasks, in lower case
+    Returns:
+        bool: True if the state is a finished state, whatever its case (ie: Completed, done)
+    """
+    return str(state).strip().lower() in closed_states
+
+
+def insort_entry(sorted_values: list, entry: tuple | None) -> None:
+    """
+    Insert an entry in a sorted list, nothing if the entry is None.
+    Args:
+        sorted_values (list[tuple]): sorted list
+        entry (tuple | None): entry to insert
+    """
+    if entry is not None:
+        insort(sorted_values, entry)
+
+
+def remove_sorted(sorted_values: list, entry: tuple | None) -> None:
+    """
+    Remove an entry from a sorted list with a binary search, nothing if it is not in the list.
+    Args:
+        sorted_values (list[tuple]): sorted list
+        entry (tuple | None): entry to remove
+    """
+    if entry is None:
+        return
+    position = bisect_left(sorted_values, entry)
+    if position < len(sorted_values) and sorted_values[position] == entry:
+        sorted_values.pop(position)
+
+
+def csv_row(row: dict) -> dict:
+    """
+    Prepare a row for the csv file, the task_list is encoded with encode_task_list().
+    Args:
+        row (dict): dictionary containing the object data
+    Returns:
+        dict: the row to write
+    """
+    if isinstance(row.get("task_list"), list):
+        row = dict(row, task_list=encode_task_list(row["task_list"]))
+    return row
+
+
+def row_from_csv(row: dict) -> dict:
+    """
+    Convert a row read from the csv file, the task_list is decoded with decode_task_list().
+    Args:
+        row (dict): row read by csv.DictReader
+    Returns:
+        dict: the row with task_list as a list of task ids
+    """
+    if "task_list" in row:
+        row["task_list"] = decode_task_list(row["task_list"])
+    return row
+
+
+def property_values(value) -> list:
+    """
+    Values under which a property is indexed: the items of a list, the value itself otherwise.
+    Args:
+        value: value of a property
+    Returns:
+        list: values to index
+    """
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
 class Projects(Data):
     """
     Specialized Data class for managing project-related data.
     Inherits from Data and initializes with a project-specific file path.
+    property_index["task_list"] give the project owning a task id.
     """
 
-    def __init__(self, path_file=PROJECTS_File):
-        super().__init__(path_file, "project")
+    indexed_properties = ("task_list", "state")
+
+    def __init__(
+        self, path_file=PROJECTS_File, storage=STORAGE, database=DATABASE_File
+    ):
+        super().__init__(path_file, "project", storage, database)
+
+    def used_task_ids(self):
+        """
+        Get the ids of the tasks in the task_list of a project,
+        kept up to date by self.property_index when task lists are updated.
+        Returns:
+            KeysView[str]: task ids used by a project
+        """
+        return self.property_index["task_list"].keys()
+
+    def available_task_ids(self, task_list: "Tasks") -> list:
+        """
+        Get the ids of the tasks not used in the task_list of a project.
+        Only the tasks without linked_project (kept up to date by the property_index of task_list)
+        are checked, so the cost depends on the number of available tasks, not on all the tasks.
+        Args:
+            task_list (Tasks): loaded tasks
+        Returns:
+            list[str]: available task ids, in numeric order
+        """
+        used = self.used_task_ids()
+        unassigned = task_list.property_index["linked_project"].get("", ())
+        return sorted(
+            (task_id for task_id in unassigned if task_id not in used), key=int
+        )
+
+    def tasks_for(self, project: Project, task_list: "Tasks") -> list:
+        """
+        Get the tasks of a project in the order of its task_list, in a single pass:
+        with the id index of task_list if the tasks are loaded,
+        otherwise with one reading of the file stopped when all the tasks are found.
+        Task ids not found in task_list are ignored.
+        Args:
+            project (Project): project whose tasks are wanted
+            task_list (Tasks): tasks, loaded or not
+        Returns:
+            list[Task]: tasks of the project
+        Raises:
+            ValueError: If the tasks file is empty or doesn't exist
+        """
+        if task_list.load_or_stream():
+            return [
+                task_list.index[task_id]
+                for task_id in project.task_list
+                if task_id in task_list.index
+            ]
+        wanted = set(project.task_list)
+        found: dict = {}
+        if wanted:
+            for task in task_list.iter_objects(lambda task: task.id in wanted):
+                found[task.id] = task
+                if len(found) == len(wanted):
+                    break
+        return [found[task_id] for task_id in project.task_list if task_id in found]
 
 
 class Tasks(Data):
     """
     Specialized Data class for managing task-related data.
     Inherits from Data and initializes with a task-specific file path.
+    property_index["linked_project"] give the task ids linked to a project id.
     """
 
-    def __init__(self, path_file=TASKS_File):
-        super().__init__(path_file, "task")
\ No newline at end of file
+    indexed_properties = ("linked_project", "state")
+
+    def __init__(self, path_file=TASKS_File, storage=STORAGE, database=DATABASE_File):
+        super().__init__(path_file, "task", storage, database)
+
+    def project_report(self) -> "ProjectReport":
+        """
+        Aggregates of the loaded tasks by linked project, computed in one pass over the tasks
+        the first time, then kept up to date by the changes of the tasks.
+        It is kept in the cache with the objects, so it is computed again only for a new version of the file.
+        Returns:
+            ProjectReport: the aggregates of the tasks
+        """
+        if self.report is None:
+            self.report = ProjectReport(self.objects, self.closed_states)
+            cached = Data.cache.get(self.cache_key())
+            if cached and cached["objects"] is self.objects:
+                # shared by the instances using the same version of the file
+                cached["report"] = self.report
+        return self.report
+
+
+def migrate_csv_to_sqlite(
+    projects_file=PROJECTS_File, tasks_file=TASKS_File, database=DATABASE_File
+) -> None:
+    """
+    Copy the projects and tasks from the csv files to the SQLite database.
+    The tables are replaced, so it can be run again to start from the csv files.
+    Args:
+        projects_file (str): Path to the projects csv file
+        tasks_file (str): Path to the tasks csv file
+        database (str): Path to the SQLite database
+    """
+    sqlite = SqliteStorage(database)
+    for data_list in [Projects(projects_file, "csv"), Tasks(tasks_file, "csv")]:
+        try:
+            data_list.data_from_csv()
+        except ValueError:
+            data_list.clear()
+        sqlite.replace_all(data_list.data_type, data_list.objects)
+
+
+def migrate_task_list_encoding(projects_file=PROJECTS_File) -> None:
+    """
+    Rewrite a projects csv file with the task_list encoding of encode_task_list(),
+    old files store the representation of a python list, ie: ['1', '2'].
+    Args:
+        projects_file (str): Path to the projects csv file
+    """
+    project_list = Projects(projects_file, "csv")
+    project_list.data_from_csv()
+    project_list.set_objects()
+    project_list.data_to_csv()
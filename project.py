@@ -2,12 +2,21 @@ import sys
 from tabulate import tabulate
 from datetime import date
 from controller import *
+from itertools import islice
+import argparse
+import csv
+import json
+import os
 import re
+import shlex
+import time
 
 # this file was reformated by black module
 
 S = "\033[1m"  # start bold
 E = "\033[0m"  # end bold
+# Number of projects or tasks displayed on each page of the display option
+PAGE_SIZE = int(os.environ.get("CS50_PAGE_SIZE", "20"))
 
 
 def main() -> None:
@@ -19,10 +28,8 @@ def main() -> None:
         - Exit the application
     """
     try:  # catch CTRL+D and print an exit message
-        print(
-            f"""\n\033[92m★★★{E} {S} Welcome to CS50 Project{E} \033[92m★★★{E}
-\033[92m▶▶{E} {S} Project and Tasks Management{E} \033[92m◀◀{E}"""
-        )
+        print(f"""\n\033[92m★★★{E} {S} Welcome to CS50 Project{E} \033[92m★★★{E}
+\033[92m▶▶{E} {S} Project and Tasks Management{E} \033[92m◀◀{E}""")
         while True:
             project_list: Projects = Projects()
             task_list: Tasks = Tasks()  # Object Tasks
@@ -38,12 +45,11 @@ def main() -> None:
                         choice_project = input(f"🔵 {S}Choose an option: {E}").strip()
                         match choice_project:
                             case "1":
-                                # Display all projects
-                                print(view_all(project_list))
-                                input(f"{S}Press Enter to continue ➡️  ... {E}")
+                                # Display all projects, page by page
+                                browse_pages(project_list)
                             case "2":
                                 # Display single project details
-                                print(view_single_data(project_list))
+                                print(view_single_data(project_list, task_list))
                                 input(f"{S}Press Enter to continue ➡️  ... {E}")
                             case "3":
                                 # Add a new project
@@ -62,6 +68,22 @@ def main() -> None:
                                 # Exit application
                                 print(f"\n👋👋 {S} Goodbye! See you soon !!{E}🙂\n")
                                 sys.exit()
+                            case "8":
+                                # Find projects by state and deadline
+                                print(query_data(project_list))
+                                input(f"{S}Press Enter to continue ➡️  ... {E}")
+                            case "9":
+                                # Find projects by words of their name and descriptions
+                                print(search_data(project_list))
+                                input(f"{S}Press Enter to continue ➡️  ... {E}")
+                            case "10":
+                                # Display the overdue projects and the projects due soon
+                                print(due_data(project_list))
+                                input(f"{S}Press Enter to continue ➡️  ... {E}")
+                            case "11":
+                                # Display the progress and workload of each project
+                                print(report_data(project_list, task_list))
+                                input(f"{S}Press Enter to continue ➡️  ... {E}")
                             case _:
                                 # Handle invalid option
                                 print(invalid_option())
@@ -74,9 +96,8 @@ def main() -> None:
                         choice_task: str = input(f"{S}🔵 Choose an option: {E}").strip()
                         match choice_task:
                             case "1":
-                                # Display all tasks
-                                print(view_all(task_list))
-                                input(f"{S}Press Enter to continue ➡️  ... {E}")
+                                # Display all tasks, page by page
+                                browse_pages(task_list)
                             case "2":
                                 # Display single task details
                                 print(view_single_data(task_list))
@@ -98,6 +119,18 @@ def main() -> None:
                                 # Exit application
                                 print(f"\n👋👋 {S} Goodbye! See you soon !!{E}🙂\n")
                                 sys.exit()
+                            case "8":
+                                # Find tasks by state, deadline and project
+                                print(query_data(task_list))
+                                input(f"{S}Press Enter to continue ➡️  ... {E}")
+                            case "9":
+                                # Find tasks by words of their name and descriptions
+                                print(search_data(task_list))
+                                input(f"{S}Press Enter to continue ➡️  ... {E}")
+                            case "10":
+                                # Display the overdue tasks and the tasks due soon
+                                print(due_data(task_list))
+                                input(f"{S}Press Enter to continue ➡️  ... {E}")
                             case _:
                                 # Handle invalid option
                                 print(invalid_option())
@@ -126,10 +159,9 @@ def view_all(data_list: Data) -> str:
     """
     try:
         data_: list = []
-        data_list.data_from_csv()
-        for object_ in data_list.objects:
-            # Create a copy to avoid modifying the original object
-            obj_dict: dict = object_.__dict__.copy()
+        for object_ in data_list.iter_objects():
+            # Create a dictionary to avoid modifying the original object
+            obj_dict: dict = object_.convert_to_dict()
             # Exclude detailed description from overview
             obj_dict.pop("detailed_description", None)
             data_.append(obj_dict)
@@ -139,29 +171,104 @@ def view_all(data_list: Data) -> str:
         return ""
 
 
-def view_single_data(data_list):
+def view_page(data_list: Data, page: int, page_size: int = PAGE_SIZE) -> tuple:
+    """
+    Display one page of the objects in a tabular format with tabulate module.
+    The objects are read lazily, only until the end of the page, so only the page is rendered.
+    Args:
+        data_list : Data [Projects or Tasks]: List of projects or tasks to display
+        page (int): number of the page, starting at 1
+        page_size (int): number of objects on a page
+    Returns:
+        tuple[str, bool]: Tabulated page or error message, and True if there is a next page
+    """
+    try:
+        data_: list = []
+        start = (page - 1) * page_size
+        # read one more object to know if there is a next page
+        for object_ in islice(data_list.iter_objects(), start, start + page_size + 1):
+            obj_dict: dict = object_.convert_to_dict()
+            # Exclude detailed description from overview
+            obj_dict.pop("detailed_description", None)
+            data_.append(obj_dict)
+        has_next = len(data_) > page_size
+        if not data_:
+            return f"⚠️  No {data_list.data_type} on page {page} ⚠️", False
+        table = tabulate(
+            data_[:page_size], headers="keys", tablefmt="grid", maxcolwidths=30
+        )
+        return table, has_next
+    except ValueError as e:
+        print(e)
+        return "", False
+
+
+def browse_pages(data_list: Data, page_size: int = PAGE_SIZE) -> None:
+    """
+    Display the objects page by page, and navigate between the pages.
+    Args:
+        data_list : Data [Projects or Tasks]: List of projects or tasks to display
+        page_size (int): number of objects on a page
+    """
+    page = 1
+    while True:
+        table, has_next = view_page(data_list, page, page_size)
+        if not table:
+            input(f"{S}Press Enter to continue ➡️  ... {E}")
+            return
+        print(table)
+        print(f"{S}Page {page}{E}")
+        choice = (
+            input(
+                "➡️  n: next page, p: previous page, a number: go to this page, Enter: back : "
+            )
+            .strip()
+            .lower()
+        )
+        if choice == "n":
+            if has_next:
+                page += 1
+            else:
+                print("⚠️  This is the last page ⚠️")
+        elif choice == "p":
+            if page > 1:
+                page -= 1
+            else:
+                print("⚠️  This is the first page ⚠️")
+        elif choice.isnumeric() and int(choice) > 0:
+            page = int(choice)
+        elif choice in ["", "q"]:
+            return
+        else:
+            print(invalid_option())
+
+
+def view_single_data(data_list, task_list=None):
     """
     Display details of a single object by its ID.
     Args:
         data_list : Data [Projects or Tasks]: List of projects or tasks.
+        task_list : Tasks used to display the tasks of a project, a new Tasks() if None
     Returns:
        str: display a single object with tabulate module or error message.
     """
 
     try:
-        data_list.data_from_csv()
-        id_ = input(f"➡️  Enter the {data_list.data_type} id you want to view: ").strip()
-        object_ = data_list.get_object(id_)
-        data_ = [object_.__dict__]
+        data_list.load_or_stream()
+        id_ = input(
+            f"➡️  Enter the {data_list.data_type} id you want to view: "
+        ).strip()
+        object_ = data_list.find_object(id_)
+        data_ = [object_.convert_to_dict()]
         single_data = tabulate(data_, headers="keys", tablefmt="grid", maxcolwidths=30)
         # If the displayed object is a project, display its linked tasks as well if they exist.
         if data_list.data_type == "project":
             linked_tasks = []
-            data_task = Tasks()
+            if task_list is None:
+                task_list = Tasks()
             try:
-                data_task.data_from_csv()
-                for task_id in object_.task_list:
-                    task = data_task.get_object(task_id).convert_to_dict()
+                for task_object in data_list.tasks_for(object_, task_list):
+                    task = task_object.convert_to_dict()
                     task.pop("detailed_description", None)
                     linked_tasks.append(task)
                 if linked_tasks:
@@ -178,10 +285,190 @@ def view_single_data(data_list):
         return ""
 
 
+def view_objects(objects: list, today: date | None = None) -> str:
+    """
+    Display a list of objects in a tabular format with tabulate module, without the detailed description.
+    Args:
+        objects (list[DataType]): projects or tasks to display
+        today (date | None): if given, the number of days left before the deadline is displayed,
+            negative when the deadline is passed
+    Returns:
+        str: Tabulated objects
+    """
+    data_: list = []
+    for object_ in objects:
+        obj_dict: dict = object_.convert_to_dict()
+        # Exclude detailed description from overview
+        obj_dict.pop("detailed_description", None)
+        if today is not None:
+            try:
+                obj_dict["days_left"] = (
+                    date.fromisoformat(object_.deadline) - today
+                ).days
+            except ValueError:
+                obj_dict["days_left"] = ""
+        data_.append(obj_dict)
+    return tabulate(data_, headers="keys", tablefmt="grid", maxcolwidths=30)
+
+
+def query_data(data_list) -> str:
+    """
+    Find projects or tasks by state, deadline range (and linked project for tasks),
+    sorted and limited, with the indexes of Data.query().
+    Args:
+        data_list : Data [Projects or Tasks]: List of projects or tasks to search
+    Returns:
+        str: Tabulated objects found, or error message
+    """
+    try:
+        data_list.data_from_csv()
+        conditions = {}
+        state = input("➡️  Enter the state (ie: To do, Enter for any): ").strip()
+        if state:
+            conditions["state"] = state
+        if data_list.data_type == "task":
+            project_id = input(
+                "➡️  Enter the linked project ID (Enter for any): "
+            ).strip()
+            if project_id:
+                conditions["linked_project"] = project_id
+        deadlines = []
+        for limit_name in ["from", "to"]:
+            deadline = input(
+                f"➡️  Enter the deadline {limit_name} (YYYY-MM-DD, Enter for no limit): "
+            ).strip()
+            if deadline:
+                try:
+                    date.fromisoformat(deadline)
+                except ValueError:
+                    raise ValueError(
+                        "⚠️ The deadline must be in the format YYYY-MM-DD ⚠️"
+                    )
+            deadlines.append(deadline or None)
+        order_by = input(
+            "➡️  Enter the property to sort on (ie: deadline, -deadline for the latest first, name, Enter for ID): "
+        ).strip()
+        limit = input(
+            f"➡️  Enter the maximum number of {data_list.data_type}s (Enter for all): "
+        ).strip()
+        if limit and not limit.isdigit():
+            raise ValueError("⚠️  Invalid input. Please enter a number. ⚠️")
+        objects = data_list.query(
+            deadline_between=tuple(deadlines) if any(deadlines) else None,
+            order_by=order_by or None,
+            limit=int(limit) if limit else None,
+            **conditions,
+        )
+        if not objects:
+            return f"⚠️  No {data_list.data_type} found ⚠️"
+        return view_objects(objects)
+    except ValueError as e:
+        print(e)
+        return ""
+
+
+def search_data(data_list) -> str:
+    """
+    Find projects or tasks containing words in their name, description or detailed description,
+    the most relevant first, with the text index of Data.search().
+    Args:
+        data_list : Data [Projects or Tasks]: List of projects or tasks to search
+    Returns:
+        str: Tabulated objects found, or error message
+    """
+    try:
+        data_list.data_from_csv()
+        text = input("➡️  Enter the words to search: ").strip()
+        if not TextIndex.words(text):
+            raise ValueError("⚠️  Enter at least one word ⚠️")
+        mode = input(
+            f"➡️  Find the {data_list.data_type}s with 1️⃣  all the words or 2️⃣  any of the words (Enter for all): "
+        ).strip()
+        if mode not in ["", "1", "2"]:
+            raise ValueError(invalid_option())
+        limit = input(
+            f"➡️  Enter the maximum number of {data_list.data_type}s (Enter for all): "
+        ).strip()
+        if limit and not limit.isdigit():
+            raise ValueError("⚠️  Invalid input. Please enter a number. ⚠️")
+        objects = data_list.search(
+            text, any_word=mode == "2", limit=int(limit) if limit else None
+        )
+        if not objects:
+            return f"⚠️  No {data_list.data_type} found ⚠️"
+        return view_objects(objects)
+    except ValueError as e:
+        print(e)
+        return ""
+
+
+def due_data(data_list, today: date | None = None) -> str:
+    """
+    Display the projects or tasks not finished by urgency: the overdue ones
+    and the ones due in the next days, the earliest deadline first, with the index of Data.due().
+    Args:
+        data_list : Data [Projects or Tasks]: List of projects or tasks
+        today (date | None): date of today, date.today() if None
+    Returns:
+        str: Tabulated objects found, or error message
+    """
+    try:
+        data_list.data_from_csv()
+        today = today or date.today()
+        days = input(
+            "➡️  Enter the number of days to look ahead (Enter for the overdue only): "
+        ).strip()
+        if days and not days.isdigit():
+            raise ValueError("⚠️  Invalid input. Please enter a number. ⚠️")
+        limit = input(
+            f"➡️  Enter the maximum number of {data_list.data_type}s (Enter for all): "
+        ).strip()
+        if limit and not limit.isdigit():
+            raise ValueError("⚠️  Invalid input. Please enter a number. ⚠️")
+        objects = data_list.due(
+            days=int(days) if days else None,
+            limit=int(limit) if limit else None,
+            today=today,
+        )
+        if not objects:
+            return f"✅  No {data_list.data_type} overdue or due soon ✅"
+        return view_objects(objects, today)
+    except ValueError as e:
+        print(e)
+        return ""
+
+
+def report_data(project_list, task_list, today: date | None = None) -> str:
+    """
+    Display for each project the number of tasks by state, the number of overdue tasks
+    and the next deadline, from the aggregates of Tasks.project_report()
+    (computed in one pass over the tasks, not by reading the tasks of each project).
+    Args:
+        project_list (Projects): List of projects
+        task_list (Tasks): List of tasks
+        today (date | None): date of today, date.today() if None
+    Returns:
+        str: Tabulated report, or error message
+    """
+    try:
+        project_list.data_from_csv()
+        try:
+            task_list.data_from_csv()
+        except ValueError:
+            # the projects have no task yet
+            task_list.clear()
+        rows = task_list.project_report().rows(project_list, today)
+        return tabulate(rows, headers="keys", tablefmt="grid", maxcolwidths=30)
+    except ValueError as e:
+        print(e)
+        return ""
+
+
 def add_data(data_list, project_list=None) -> None:
     """
     Add a new project or task to the data_list.
-    We don't use objects in this case but just data_list.data.
+    Only the new row is appended to the csv file, the existing rows are not rewritten.
+    The task and the task_list of its linked project are saved together in a Session.
     Args:
         data_list : Data [Projects or Tasks]: List to add data to
         project_list : If data is a Task we import project too, to update it if linked_project is added
@@ -191,10 +478,10 @@ def add_data(data_list, project_list=None) -> None:
     try:
         data_list.data_from_csv()
     except ValueError:
-        data_list.data = []
+        data_list.clear()
 
     id_ = new_id(data_list)
-    data_input = {
+    data_input: dict = {
         "id": id_,
         "name": input(f"➡️  Enter {data_list.data_type} name: ").strip(),
         "description": input(
@@ -203,7 +490,7 @@ def add_data(data_list, project_list=None) -> None:
         "detailed_description": input(
             f"➡️  Enter a detailed description for the {data_list.data_type}: "
         ).strip(),
-        "creation_date": date.today(),
+        "creation_date": date.today().isoformat(),
     }
     # Validate deadline with maximum 3 attempts
     compter = 0
@@ -249,8 +536,6 @@ def add_data(data_list, project_list=None) -> None:
                     if project_id in project_list.get_all_ids():
                         print(project_id)
                         data_input["linked_project"] = str(project_id)
-                        project_list.get_object(str(project_id)).task_list += [id_]
-                        save_change(project_list)
                         break
                     else:
                         print("⚠️  No project with this ID ⚠️")
@@ -262,17 +547,29 @@ def add_data(data_list, project_list=None) -> None:
             if compter_id == 3:
                 print("⚠️ 3 wrong attempt start again ⚠️")
                 return
+    try:
+        with Session(data_list, project_list):
+            if data_input.get("linked_project"):
+                # add the task to the task list of the linked project
+                project = project_list.get_object(data_input["linked_project"])
+                project_list.update_object(
+                    project, "task_list", project.task_list + [id_]
+                )
+            data_list.add_object(data_input)
+    except (ValueError, OSError) as e:
+        # ie: StaleDataError if the file was changed by another user, nothing was saved
+        print(e)
+        return
     print(
         f"🟢 your {data_list.data_type} has been added successfully with ID = {id_} 🟢"
     )
-    data_list.data.append(data_input)
-    data_list.data_to_csv()
 
 
 def update_data(data_list_1, data_list_2) -> None:
     """
     we import both projects and tasks to allow change of task_list and project_linked in same time
     Update an existing project or task, potentially modifying related data (task list and linked project).
+    The changes are saved in a Session: each file is written once, or not at all if the update is canceled.
     Args:
         data_list_1 (Data [Projects or Tasks]): Primary data list to update
         data_list_2 (Data [Projects or Tasks]): Secondary data list for updated related property
@@ -284,163 +581,194 @@ def update_data(data_list_1, data_list_2) -> None:
         try:
             data_list_2.data_from_csv()
         except ValueError:
-            data_list_2.data = []
+            data_list_2.clear()
         # Get an object to update
-        id_ = input(f"➡️  Enter {data_list_1.data_type} ID you want to update: ").strip()
+        id_ = input(
+            f"➡️  Enter {data_list_1.data_type} ID you want to update: "
+        ).strip()
         data_ = data_list_1.get_object(id_)
         print(
-            tabulate([data_.__dict__], headers="keys", tablefmt="grid", maxcolwidths=30)
+            tabulate(
+                [data_.convert_to_dict()],
+                headers="keys",
+                tablefmt="grid",
+                maxcolwidths=30,
+            )
         )
         # Choose property to update
         compteur = 0
-        while compteur < 3:
-            property_o = (
-                input("🔄  Which Property you want to update ?: ").strip().lower()
-            )
-            property_ = ""
-            if property_o.find(" "):
-                property_ = property_o.replace(" ", "_")
-            # id the object data_ has attribut property_
-            if hasattr(data_, property_):
-                # Special handling for task_list updates
-                if property_ == "task_list":
-                    compteur_err_task = 0
-                    all_task_ids = data_list_2.get_all_ids()
-                    used_task = [
-                        item
-                        for sublist in data_list_1.get_all_property_value("task_list")
-                        for item in sublist
-                    ]
-                    used_task_int = [int(task) for task in used_task]
-                    available_task_id = list(set(all_task_ids) - set(used_task_int))
-                    available_task = []
-                    for id_task in available_task_id:
-                        available_task.append(
-                            f"{id_task}: {data_list_2.get_object(str(id_task)).name}"
-                        )
-                    while compteur_err_task < 3:
-                        print(f"📋  list of available task : {available_task}")
-                        value = input(
-                            "➡️  Enter the ID of the task you want to add to this project: "
-                        ).strip()
-                        # Validate task usage in another project
-                        if not value in data_.task_list and value in used_task:
-                            print(f"⚠️ This task is already used in other project ⚠️")
-                            compteur_err_task += 1
-                        elif value in data_.task_list:
-                            # ask for Removing a task from the project if the task is already in task_list
-                            confirm = (
-                                input(
-                                    f"⚠️ This task is already in task_list ⚠️ you want to delete it ? (yes/no)❓: "
-                                )
-                                .strip()
-                                .lower()
+        updated = ""
+        # the changes of both lists are saved together at the end of the update
+        with Session(data_list_1, data_list_2):
+            while compteur < 3:
+                property_o = (
+                    input("🔄  Which Property you want to update ?: ").strip().lower()
+                )
+                property_ = ""
+                if property_o.find(" "):
+                    property_ = property_o.replace(" ", "_")
+                # if property_ is one of the fields of the object data_
+                if property_ in data_.fields:
+                    # Special handling for task_list updates
+                    if property_ == "task_list":
+                        compteur_err_task = 0
+                        # task ids used by a project, kept up to date by the project index
+                        used_task = data_list_1.used_task_ids()
+                        available_task = []
+                        for id_task in data_list_1.available_task_ids(data_list_2):
+                            available_task.append(
+                                f"{id_task}: {data_list_2.get_object(id_task).name}"
                             )
-                            if confirm in ["yes", "y"]:
-                                # remove the task from the project task list
-                                data_.task_list.remove(value)
-                                # delete project id from linked_project for the task removed
-                                data_list_2.get_object(value).linked_project = ""
-                                save_change(data_list_1)
-                                save_change(data_list_2)
-                                break
-                            else:
-                                raise ValueError("🔴  The update has been canceled 🔴")
-                        elif not value.isnumeric() or not int(value) in all_task_ids:
-                            print(f"⚠️  No task with this ID ⚠️")
-                            compteur_err_task += 1
-                        else:
-                            # add the task into the task list
-                            data_.task_list += [value]
-                            # add the project id to the task linked project
-                            data_list_2.get_object(value).linked_project = id_
-                            save_change(data_list_1)
-                            save_change(data_list_2)
-                            break
-                    if compteur_err_task == 3:
-                        print("⚠️ 3 wrong attempt start again ⚠️")
-                        break
-                # Special handling for linked_project updates
-                elif property_ == "linked_project":
-                    if data_.linked_project == "":
-                        available_project = []
-                        for project in data_list_2.objects:
-                            available_project.append(f"{project.id}: {project.name} ")
-                        print(f"Available projects : {available_project}")
-                        compter_id = 0
-                        while compter_id < 3:
-                            try:
-                                project_id = int(
+                        while compteur_err_task < 3:
+                            print(f"📋  list of available task : {available_task}")
+                            value = input(
+                                "➡️  Enter the ID of the task you want to add to this project: "
+                            ).strip()
+                            # Validate task usage in another project
+                            if not value in data_.task_list and value in used_task:
+                                print(
+                                    f"⚠️ This task is already used in other project ⚠️"
+                                )
+                                compteur_err_task += 1
+                            elif value in data_.task_list:
+                                # ask for Removing a task from the project if the task is already in task_list
+                                confirm = (
                                     input(
-                                        "➡️  Enter the ID of the project you want to add to this task: "
-                                    ).strip()
+                                        f"⚠️ This task is already in task_list ⚠️ you want to delete it ? (yes/no)❓: "
+                                    )
+                                    .strip()
+                                    .lower()
                                 )
-                                print(f"all ids: {data_list_2.get_all_ids()}")
-                                if project_id in data_list_2.get_all_ids():
-                                    print(project_id)
-                                    data_.linked_project = str(project_id)
-                                    data_list_2.get_object(
-                                        str(project_id)
-                                    ).task_list += [id_]
-                                    save_change(data_list_2)
-                                    save_change(data_list_1)
+                                if confirm in ["yes", "y"]:
+                                    # remove the task from the project task list
+                                    data_list_1.update_object(
+                                        data_,
+                                        "task_list",
+                                        [
+                                            task
+                                            for task in data_.task_list
+                                            if task != value
+                                        ],
+                                    )
+                                    # delete project id from linked_project for the task removed
+                                    data_list_2.update_object(
+                                        data_list_2.get_object(value),
+                                        "linked_project",
+                                        "",
+                                    )
                                     break
                                 else:
-                                    print("⚠️  No project with this ID ⚠️")
-                                    compter_id += 1
-                            except ValueError as e:
-                                print(e)
-                                print("⚠️  Invalid input. Please enter a numeric ID. ⚠️")
-                                compter_id += 1
-                        if compter_id == 3:
+                                    raise ValueError(
+                                        "🔴  The update has been canceled 🔴"
+                                    )
+                            elif not value in data_list_2.index:
+                                print(f"⚠️  No task with this ID ⚠️")
+                                compteur_err_task += 1
+                            else:
+                                # add the task into the task list
+                                data_list_1.update_object(
+                                    data_, "task_list", data_.task_list + [value]
+                                )
+                                # add the project id to the task linked project
+                                data_list_2.update_object(
+                                    data_list_2.get_object(value), "linked_project", id_
+                                )
+                                break
+                        if compteur_err_task == 3:
                             print("⚠️ 3 wrong attempt start again ⚠️")
-                            return
-                    else:
-                        raise ValueError(
-                            "🔴  A project is already linked to this task. To update the task linked_project go to project and update task_list 🔴"
-                        )
-                elif property_ == "deadline":
-                    compter_deadline = 0
-                    while compter_deadline < 3:
-                        deadline = input("➡️  Enter deadline (YYYY-MM-DD ie:2024-12-31): ").strip()
-                        if is_valid_deadline(deadline):
-                            setattr(data_, property_, deadline)
-                            save_change(data_list_1)
                             break
+                    # Special handling for linked_project updates
+                    elif property_ == "linked_project":
+                        if data_.linked_project == "":
+                            available_project = []
+                            for project in data_list_2.objects:
+                                available_project.append(
+                                    f"{project.id}: {project.name} "
+                                )
+                            print(f"Available projects : {available_project}")
+                            compter_id = 0
+                            while compter_id < 3:
+                                try:
+                                    project_id = int(
+                                        input(
+                                            "➡️  Enter the ID of the project you want to add to this task: "
+                                        ).strip()
+                                    )
+                                    print(f"all ids: {data_list_2.get_all_ids()}")
+                                    if project_id in data_list_2.get_all_ids():
+                                        print(project_id)
+                                        data_list_1.update_object(
+                                            data_, "linked_project", str(project_id)
+                                        )
+                                        project = data_list_2.get_object(
+                                            str(project_id)
+                                        )
+                                        data_list_2.update_object(
+                                            project,
+                                            "task_list",
+                                            project.task_list + [id_],
+                                        )
+                                        break
+                                    else:
+                                        print("⚠️  No project with this ID ⚠️")
+                                        compter_id += 1
+                                except ValueError as e:
+                                    print(e)
+                                    print(
+                                        "⚠️  Invalid input. Please enter a numeric ID. ⚠️"
+                                    )
+                                    compter_id += 1
+                            if compter_id == 3:
+                                print("⚠️ 3 wrong attempt start again ⚠️")
+                                return
                         else:
-                            print(
-                                "⚠️ Deadline must be today or later, and in the format (YYYY-MM-DD, e.g., 2025-01-30) ⚠️"
+                            raise ValueError(
+                                "🔴  A project is already linked to this task. To update the task linked_project go to project and update task_list 🔴"
                             )
-                            compter_deadline += 1
-                    if compter_deadline == 3:
-                        print("⚠️ 3 wrong attempt start again ⚠️")
-                        return
-
-                elif property_ == "id":
-                    raise ValueError("🔴  You can't modify the id 🔴")
-                # Update any other properties
+                    elif property_ == "deadline":
+                        compter_deadline = 0
+                        while compter_deadline < 3:
+                            deadline = input(
+                                "➡️  Enter deadline (YYYY-MM-DD ie:2024-12-31): "
+                            ).strip()
+                            if is_valid_deadline(deadline):
+                                data_list_1.update_object(data_, property_, deadline)
+                                break
+                            else:
+                                print(
+                                    "⚠️ Deadline must be today or later, and in the format (YYYY-MM-DD, e.g., 2025-01-30) ⚠️"
+                                )
+                                compter_deadline += 1
+                        if compter_deadline == 3:
+                            print("⚠️ 3 wrong attempt start again ⚠️")
+                            return
+
+                    elif property_ == "id":
+                        raise ValueError("🔴  You can't modify the id 🔴")
+                    # Update any other properties
+                    else:
+                        value = input("➡️  Enter the new value: ").strip()
+                        data_list_1.update_object(data_, property_, value)
+                    updated = property_
+                    break
                 else:
-                    value = input("➡️  Enter the new value: ").strip()
-                    setattr(data_, property_, value)
-                    save_change(data_list_1)
-                print(
-                    f"🟢  The property '{property_}' has been updated successfully! 🟢"
-                )
-                break
-            else:
-                compteur += 1
-                print(
-                    f"🔴  The property '{property_}' does not exist in the {data_list_1.data_type} 🔴"
-                )
+                    compteur += 1
+                    print(
+                        f"🔴  The property '{property_}' does not exist in the {data_list_1.data_type} 🔴"
+                    )
+        # printed once the changes are saved
+        if updated:
+            print(f"🟢  The property '{updated}' has been updated successfully! 🟢")
         if compteur == 3:
             print("⚠️ 3 wrong attempt start again ⚠️")
-    except ValueError as e:
+    except (ValueError, OSError) as e:
         print(e)
 
 
 def delete_data(data_list_1, data_list_2) -> None:
     """
-    Delete a project or task and handle related dependencies.
+    Delete one or several projects or tasks and handle related dependencies.
+    The deletion and the changes of the related objects are done by a Cascade and saved together.
     Args:
         data_list_1 (Data [Projects or Tasks]): Primary data list to delete from
         data_list_2 (Data [Projects or Tasks]): Secondary data list for deleting the id from task_list if linked_project
@@ -449,13 +777,18 @@ def delete_data(data_list_1, data_list_2) -> None:
     """
     try:
         data_list_1.data_from_csv()
-        id_ = input(
-            f"➡️  Enter the {data_list_1.data_type} ID you want to delete: "
-        ).strip()
-        object_ = data_list_1.get_object(id_)
-        data_ = [object_.convert_to_dict()]
+        ids = (
+            input(
+                f"➡️  Enter the {data_list_1.data_type} ID you want to delete (or several IDs separated by commas): "
+            )
+            .replace(",", " ")
+            .split()
+        )
+        data_ = [data_list_1.get_object(id_).convert_to_dict() for id_ in ids]
+        if not data_:
+            raise ValueError(f"⚠️  No {data_list_1.data_type} ID entered ⚠️")
         print(tabulate(data_, headers="keys", tablefmt="grid", maxcolwidths=30))
-        # Confirm and delete the object
+        # Confirm and delete the objects
         confirmer = (
             input(
                 f"⚠️  Are You sur you want delete this {data_list_1.data_type} (yes/no)❓: "
@@ -464,39 +797,370 @@ def delete_data(data_list_1, data_list_2) -> None:
             .lower()
         )
         if confirmer in ["yes", "y"]:
-            # Delete the object
-            data_list_1.delete_object(object_)
-            save_change(data_list_1)
-            try:
-                # Handle related objects
-                if data_list_1.data_type == "project":
-                    try:  # if a task linked to this project, delete "linked_project" property value
-                        data_list_2.data_from_csv()
-                        ob1 = data_list_2.get_object_by_property_value(
-                            "linked_project", id_
-                        )
-                        setattr(ob1, "linked_project", "")
-                        save_change(data_list_2)
-                    except ValueError:
-                        ...
-                if data_list_1.data_type == "task":
-                    try:  # if a project have this task in task_list, remove the task id
-                        data_list_2.data_from_csv()
-                        ob2 = data_list_2.get_object_by_property_value("task_list", id_)
-                        ob2.task_list.remove(id_)
-                        save_change(data_list_2)
-                    except ValueError:
-                        ...
-            except ValueError as e:
-                print(e)
-
+            # the deletion and the update of the related objects are saved together
+            Cascade(data_list_1, data_list_2).delete(ids)
             print(f"🟢  Your {data_list_1.data_type} has been deleted successfully 🟢")
         else:
             print("🔴  The deletion has been canceled 🔴")
+    except (ValueError, OSError) as e:
+        print(e)
+
+
+def import_data(
+    data_list, path_file: str, project_list=None, today: date | None = None
+) -> dict:
+    """
+    Import projects or tasks from a CSV file or a JSON Lines file (.jsonl) without prompts.
+    The rows are read one at a time and validated like in add_data: the deadline must be
+    valid (each distinct deadline is checked once) and the linked_project an existing project.
+    The ids of all the valid rows are allocated at once, the tasks are added to the task_list
+    of their project, then each file is written once in a Session.
+    The task_list of the imported projects is empty, the tasks are linked with their linked_project.
+    Args:
+        data_list (Data [Projects or Tasks]): List to import data to
+        path_file (str): Path to the CSV or JSON Lines file
+        project_list (Projects): projects to link the imported tasks to
+        today (date, optional for testing purpose): Reference date for validation. Defaults to today.
+    Returns:
+        dict: "imported" ids, "rejected" rows (line, reason) and "seconds" taken
+    Raises:
+        ValueError: If the file to import doesn't exist
+    """
+    start = time.perf_counter()
+    today = today or date.today()
+    related = project_list if data_list.data_type == "task" else None
+    for list_ in [data_list, related]:
+        if list_ is not None:
+            try:
+                list_.data_from_csv()
+            except ValueError:
+                list_.clear()
+    valid_deadlines = {}
+    rows = []
+    rejected = []
+    for line, row in read_import_rows(path_file):
+        if row is None:
+            rejected.append((line, "invalid row"))
+            continue
+        values = {
+            key: str(value).strip() for key, value in row.items() if value is not None
+        }
+        deadline = values.get("deadline", "")
+        if deadline not in valid_deadlines:
+            valid_deadlines[deadline] = is_valid_deadline(deadline, today)
+        if not valid_deadlines[deadline]:
+            rejected.append((line, f"invalid deadline '{deadline}'"))
+            continue
+        data_input: dict = {
+            "id": "",
+            "name": values.get("name", ""),
+            "description": values.get("description", ""),
+            "detailed_description": values.get("detailed_description", ""),
+            "creation_date": values.get("creation_date") or today.isoformat(),
+            "deadline": deadline,
+            "state": values.get("state") or "To do",
+        }
+        if related is None:
+            data_input["task_list"] = []
+        else:
+            linked_project = values.get("linked_project", "")
+            if linked_project and linked_project not in related.index:
+                rejected.append((line, f"no project with ID {linked_project}"))
+                continue
+            data_input["linked_project"] = linked_project
+        rows.append(data_input)
+
+    if rows:
+        links: dict[str, list[str]] = {}
+        with Session(data_list, related):
+            for id_, data_input in zip(data_list.new_ids(len(rows)), rows):
+                data_input["id"] = id_
+                data_list.add_object(data_input)
+                if data_input.get("linked_project"):
+                    links.setdefault(data_input["linked_project"], []).append(id_)
+            # each project is updated once with all its new tasks
+            if related is not None:
+                for project_id, task_ids in links.items():
+                    project = related.get_object(project_id)
+                    related.update_object(
+                        project, "task_list", project.task_list + task_ids
+                    )
+    return {
+        "imported": [data_input["id"] for data_input in rows],
+        "rejected": rejected,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def read_import_rows(path_file: str):
+    """
+    Yield the rows of a CSV file with a header, or of a JSON Lines file (.jsonl), one at a time.
+    Args:
+        path_file (str): Path to the file
+    Yields:
+        tuple[int, dict | None]: line number and row, None if the line is not a JSON object
+    Raises:
+        ValueError: If the file doesn't exist
+    """
+    if not os.path.exists(path_file):
+        raise ValueError(f"⚠️  The file {path_file} does not exist ⚠️")
+    with open(path_file, "r", newline="") as file:
+        if path_file.endswith((".jsonl", ".json")):
+            for line, text in enumerate(file, 1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except ValueError:
+                    row = None
+                yield line, row if isinstance(row, dict) else None
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def print_import_report(report: dict, data_type: str) -> None:
+    """
+    Print the number of rows imported, the throughput and the rejected rows.
+    Args:
+        report (dict): report returned by import_data
+        data_type (str): 'project' or 'task'
+    """
+    imported = len(report["imported"])
+    seconds = report["seconds"]
+    rate = imported / seconds if seconds else imported
+    print(
+        f"🟢  {imported} {data_type}(s) imported in {seconds:.2f}s ({rate:.0f} rows/s) 🟢"
+    )
+    if report["rejected"]:
+        print(f"⚠️  {len(report['rejected'])} row(s) rejected ⚠️")
+        print(
+            tabulate(
+                report["rejected"],
+                headers=["line", "reason"],
+                tablefmt="grid",
+                maxcolwidths=60,
+            )
+        )
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Returns:
+        argparse.ArgumentParser: parser of the commands, used for the command line and the lines of a script
+    """
+    parser = argparse.ArgumentParser(
+        prog="project.py",
+        description="Project and Tasks Management, without arguments the menus are displayed",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser(
+        "import", help="import projects or tasks from a CSV or JSON Lines (.jsonl) file"
+    )
+    import_parser.add_argument("data_type", choices=["project", "task"])
+    import_parser.add_argument(
+        "file", help="CSV file with a header, or JSON Lines file"
+    )
+    exec_parser = commands.add_parser(
+        "exec",
+        help="run the commands of a script file, one by line, and save once at the end",
+    )
+    exec_parser.add_argument(
+        "file", help="script file, ie: task add --name Test --deadline 2030-01-31"
+    )
+    commands.add_parser(
+        "report",
+        help="display the tasks by state, the overdue tasks and the next deadline of each project",
+    )
+    for data_type in ["project", "task"]:
+        type_parser = commands.add_parser(
+            data_type, help=f"add, update or delete a {data_type}"
+        )
+        type_parser.set_defaults(data_type=data_type)
+        actions = type_parser.add_subparsers(dest="action", required=True)
+        add_parser = actions.add_parser("add", help=f"add a {data_type}")
+        add_parser.add_argument("--name", required=True)
+        add_parser.add_argument("--description", default="")
+        add_parser.add_argument("--detailed-description", default="")
+        add_parser.add_argument("--deadline", required=True, help="YYYY-MM-DD")
+        update_parser = actions.add_parser(
+            "update", help=f"update the properties of a {data_type}"
+        )
+        update_parser.add_argument("id")
+        for option in [
+            "--name",
+            "--description",
+            "--detailed-description",
+            "--deadline",
+            "--state",
+        ]:
+            update_parser.add_argument(option)
+        if data_type == "task":
+            for action_parser in [add_parser, update_parser]:
+                action_parser.add_argument(
+                    "--project", help="ID of the project linked to the task"
+                )
+        delete_parser = actions.add_parser(
+            "delete", help=f"delete {data_type}s and update their links"
+        )
+        delete_parser.add_argument("ids", nargs="+")
+    return parser
+
+
+def command_line(argv: list, project_list=None, task_list=None) -> None:
+    """
+    Run a command without the menus, e.g.
+        python project.py import task tasks.jsonl
+        python project.py task add --name Test --deadline 2030-01-31 --project 1
+        python project.py exec script.txt
+        python project.py report
+    The add, update and delete commands are saved together at the end.
+    Args:
+        argv (list[str]): arguments of the command line
+        project_list (Projects, optional for testing purpose): Defaults to Projects()
+        task_list (Tasks, optional for testing purpose): Defaults to Tasks()
+    """
+    args = get_parser().parse_args(argv)
+    project_list = project_list or Projects()
+    task_list = task_list or Tasks()
+    try:
+        if args.command == "import":
+            data_list = project_list if args.data_type == "project" else task_list
+            report = import_data(data_list, args.file, project_list)
+            print_import_report(report, args.data_type)
+            return
+        for data_list in [project_list, task_list]:
+            try:
+                data_list.data_from_csv()
+            except ValueError:
+                data_list.clear()
+        if args.command == "report":
+            print(report_data(project_list, task_list))
+        elif args.command == "exec":
+            run_script(args.file, project_list, task_list)
+        else:
+            with Session(project_list, task_list):
+                print(run_command(args, project_list, task_list))
     except ValueError as e:
         print(e)
 
 
+def run_script(path_file: str, project_list, task_list) -> None:
+    """
+    Run the commands of a script file on the loaded projects and tasks, then save all the changes once.
+    Each line is a command like on the command line (without python project.py),
+    empty lines and lines starting with # are ignored.
+    A line with an invalid command is reported and skipped, the other commands are still run.
+    Args:
+        path_file (str): Path to the script file
+        project_list (Projects): loaded projects
+        task_list (Tasks): loaded tasks
+    Raises:
+        ValueError: If the script file doesn't exist
+    """
+    if not os.path.exists(path_file):
+        raise ValueError(f"⚠️  The file {path_file} does not exist ⚠️")
+    parser = get_parser()
+    start = time.perf_counter()
+    done = 0
+    failed = 0
+    with open(path_file, "r") as file, Session(project_list, task_list):
+        for line, text in enumerate(file, 1):
+            text = text.strip()
+            if not text or text.startswith("#"):
+                continue
+            try:
+                args = parser.parse_args(shlex.split(text))
+                if args.command in ["import", "exec", "report"]:
+                    raise ValueError(f"⚠️  {args.command} can't be used in a script ⚠️")
+                run_command(args, project_list, task_list)
+                done += 1
+            except (ValueError, SystemExit) as e:
+                # argparse exits after printing the error of an invalid command
+                failed += 1
+                print(
+                    f"line {line}: {e if isinstance(e, ValueError) else 'invalid command'}"
+                )
+    print(
+        f"🟢  {done} command(s) run in {time.perf_counter() - start:.2f}s, {failed} failed 🟢"
+    )
+
+
+def run_command(args, project_list, task_list) -> str:
+    """
+    Add, update or delete a project or a task in the loaded lists, without saving.
+    The values are validated like in add_data and update_data before any change.
+    Args:
+        args (argparse.Namespace): command parsed by get_parser()
+        project_list (Projects): loaded projects
+        task_list (Tasks): loaded tasks
+    Returns:
+        str: message for the user
+    Raises:
+        ValueError: If a value is invalid or an ID doesn't exist
+    """
+    data_list = project_list if args.data_type == "project" else task_list
+    # only a task is linked to a project
+    project_id = getattr(args, "project", None) if args.data_type == "task" else None
+    deadline = getattr(args, "deadline", None)
+    if deadline is not None and not is_valid_deadline(deadline):
+        raise ValueError(
+            "⚠️ Deadline must be today or later, and in the format (YYYY-MM-DD, e.g., 2025-01-30) ⚠️"
+        )
+    if project_id and project_id not in project_list.index:
+        raise ValueError("⚠️  No project with this ID ⚠️")
+
+    if args.action == "add":
+        id_ = data_list.new_id()
+        data_input = {
+            "id": id_,
+            "name": args.name,
+            "description": args.description,
+            "detailed_description": args.detailed_description,
+            "creation_date": date.today().isoformat(),
+            "deadline": args.deadline,
+            "state": "To do",
+        }
+        if data_list.data_type == "project":
+            data_input["task_list"] = []
+        else:
+            data_input["linked_project"] = project_id or ""
+        data_list.add_object(data_input)
+        if project_id:
+            project = project_list.get_object(project_id)
+            project_list.update_object(project, "task_list", project.task_list + [id_])
+        return f"🟢 your {data_list.data_type} has been added successfully with ID = {id_} 🟢"
+
+    if args.action == "update":
+        data_ = data_list.get_object(args.id)
+        if project_id and data_.linked_project:
+            raise ValueError(
+                "🔴  A project is already linked to this task. To update the task linked_project go to project and update task_list 🔴"
+            )
+        for property_ in [
+            "name",
+            "description",
+            "detailed_description",
+            "deadline",
+            "state",
+        ]:
+            value = getattr(args, property_)
+            if value is not None:
+                data_list.update_object(data_, property_, value)
+        if project_id:
+            data_list.update_object(data_, "linked_project", project_id)
+            project = project_list.get_object(project_id)
+            project_list.update_object(
+                project, "task_list", project.task_list + [args.id]
+            )
+        return f"🟢  Your {data_list.data_type} has been updated successfully 🟢"
+
+    related = task_list if data_list.data_type == "project" else project_list
+    Cascade(data_list, related).delete(args.ids)
+    return f"🟢  Your {data_list.data_type} has been deleted successfully 🟢"
+
+
 def save_change(data_list) -> None:
     """
     Save changes to the data list by updating objects to data_list.data and writing to CSV.
@@ -504,8 +1168,7 @@ def save_change(data_list) -> None:
         data_list (Data[Projects or Tasks]): Data list to save
     """
     try:
-        data_list.set_objects()
-        data_list.data_to_csv()
+        data_list.save()
     except ValueError as e:
         print(e)
 
@@ -514,27 +1177,26 @@ def new_id(list_: Data) -> str:
     """
     this way to generate ID, allow us to reuse ID if the project or the task are deleted
     otherwise we could use new_id=max(all_ids)+1
+    The lowest free ID is given by the IdAllocator of the data list, without scanning all the IDs
     Args:
         list_ (Data): Data list to check existing IDs
     Returns:
         str: A new unique ID
     """
-    all_ids = list_.get_all_ids()
-    new_id_: int = 1
-    while new_id_ in all_ids:
-        new_id_ += 1
-    return str(new_id_)
+    return list_.new_id()
 
 
-def is_valid_deadline(deadline: str, today: date = date.today()) -> bool:
+def is_valid_deadline(deadline: str, today: date | None = None) -> bool:
     """
     Validate deadline format YYYY-MM-DD and ensure it is not in the past.
     Args:
         deadline (str): Deadline date string
-        today (date, optional for testing purpose): Reference date for validation. Defaults to today.
+        today (date, optional for testing purpose): Reference date for validation. Defaults to today,
+            taken at each call for a program running for several days (ie: server.py).
     Returns:
         bool: True if deadline is valid, False otherwise
     """
+    today = today or date.today()
 
     pattern = (
         r"^(?P<Year>20[2-9][0-9])-(?P<Month>0[0-9]|1[0-2])-(?P<DD>[0-2][0-9]|3[0-1])$"
@@ -568,6 +1230,10 @@ def get_project_option():
     5️⃣ . ➖ Delete project
     6️⃣ . 🔙 Back
     7️⃣ . ❌ Exit
+    8️⃣ . 🔎 Query projects
+    9️⃣ . 🔤 Search projects
+    🔟 . ⏰ Overdue and due soon projects
+    1️⃣1️⃣ . 📊 Progress report
     """
 
 
@@ -580,6 +1246,9 @@ def get_task_option():
     5️⃣ . ➖ Delete task
     6️⃣ . 🔙 Back
     7️⃣ . ❌ Exit
+    8️⃣ . 🔎 Query tasks
+    9️⃣ . 🔤 Search tasks
+    🔟 . ⏰ Overdue and due soon tasks
     """
 
 
@@ -588,4 +1257,7 @@ def invalid_option() -> str:
 
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1:
+        command_line(sys.argv[1:])
+    else:
+        main()
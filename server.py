@@ -0,0 +1,319 @@
+import argparse
+import json
+import threading
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from controller import *
+from project import run_command
+
+# this file was reformated by black module
+
+# Address of the server, only reachable from this computer by default
+HOST = "127.0.0.1"
+PORT = 8050
+
+
+class Store:
+    """
+    Projects and tasks loaded once and shared by all the requests of the server.
+    A lock gives each request a consistent state: the changes of a request are saved in a Session
+    before another request can read them.
+    The files are read again only when they were changed by another program.
+    Attributes:
+        project_list (Projects): loaded projects
+        task_list (Tasks): loaded tasks
+        lock (threading.RLock): lock held during each request
+    """
+
+    def __init__(self, project_list=None, task_list=None):
+        self.project_list = project_list or Projects()
+        self.task_list = task_list or Tasks()
+        self.lock = threading.RLock()
+
+    def data_list(self, collection: str):
+        """
+        Args:
+            collection (str): "projects" or "tasks"
+        Returns:
+            Data | None: the projects or tasks, up to date with their file, None for an unknown collection
+        """
+        data_list = {"projects": self.project_list, "tasks": self.task_list}.get(
+            collection
+        )
+        if data_list is not None:
+            self.refresh(data_list)
+        return data_list
+
+    def refresh(self, data_list) -> None:
+        """
+        Load the data again if its file changed since it was loaded.
+        Args:
+            data_list (Data): projects or tasks
+        """
+        signature = data_list.file_signature()
+        if signature is None or signature != data_list.signature:
+            try:
+                data_list.data_from_csv()
+            except ValueError:
+                # the file is empty or doesn't exist
+                data_list.clear()
+                data_list.signature = signature
+
+    def list(self, collection: str, query: dict) -> list:
+        """
+        Args:
+            collection (str): "projects" or "tasks"
+            query (dict): property values the objects must have, deadline_from and deadline_to,
+                order_by, and offset and limit for a page
+        Returns:
+            list[dict]: the matching objects, found with Data.query()
+        """
+        data_list = self.data_list(collection)
+        offset = int(query.pop("offset", 0))
+        limit = query.pop("limit", None)
+        deadlines = (query.pop("deadline_from", None), query.pop("deadline_to", None))
+        objects = data_list.query(
+            deadline_between=deadlines if any(deadlines) else None,
+            order_by=query.pop("order_by", None),
+            limit=offset + int(limit) if limit is not None else None,
+            **query,
+        )
+        return [object_.convert_to_dict() for object_ in objects[offset:]]
+
+    def get(self, collection: str, id_: str) -> dict:
+        """
+        Args:
+            collection (str): "projects" or "tasks"
+            id_ (str): ID of the object
+        Returns:
+            dict: the object, with its tasks for a project
+        Raises:
+            KeyError: If no object has this ID
+        """
+        data_list = self.data_list(collection)
+        object_ = data_list.index[id_]
+        data_ = object_.convert_to_dict()
+        if collection == "projects":
+            self.refresh(self.task_list)
+            data_["tasks"] = [
+                self.task_list.index[task_id].convert_to_dict()
+                for task_id in object_.task_list
+                if task_id in self.task_list.index
+            ]
+        return data_
+
+    def change(
+        self, collection: str, action: str, id_=None, values=None
+    ) -> dict | None:
+        """
+        Add, update or delete an object with project.run_command(), and save the changes.
+        Args:
+            collection (str): "projects" or "tasks"
+            action (str): "add", "update" or "delete"
+            id_ (str | None): ID of the object to update or delete
+            values (dict | None): name, description, detailed_description, deadline, state,
+                and project for a task
+        Returns:
+            dict | None: the object added or updated
+        Raises:
+            KeyError: If no object has this ID
+            ValueError: If a value is invalid
+        """
+        data_list = self.data_list(collection)
+        self.refresh(self.project_list)
+        self.refresh(self.task_list)
+        values = values or {}
+        if id_ is not None and id_ not in data_list.index:
+            raise KeyError(id_)
+        if action == "add":
+            if not values.get("name") or not values.get("deadline"):
+                raise ValueError("⚠️  name and deadline are required ⚠️")
+            id_ = data_list.new_id()
+            defaults: dict[str, str | None] = {
+                "description": "",
+                "detailed_description": "",
+            }
+        else:
+            defaults = {"description": None, "detailed_description": None}
+        arguments: dict[str, str | None] = {
+            "name": None,
+            "deadline": None,
+            "state": None,
+        }
+        if collection == "tasks":
+            # only a task is linked to a project
+            arguments["project"] = None
+        arguments.update(defaults)
+        for key, value in values.items():
+            if key not in arguments:
+                raise ValueError(f"🔴  The property '{key}' can't be changed 🔴")
+            arguments[key] = None if value is None else str(value)
+        args = Namespace(
+            data_type=data_list.data_type, action=action, id=id_, ids=[id_], **arguments
+        )
+        with Session(self.project_list, self.task_list):
+            run_command(args, self.project_list, self.task_list)
+        if action == "delete":
+            return None
+        return data_list.index[id_].convert_to_dict()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API of the projects and tasks:
+        GET /projects, GET /tasks: list, filtered by the query
+            (ie: ?state=Done&deadline_from=2025-01-01&order_by=deadline&limit=10)
+        GET /projects/<id>, GET /tasks/<id>: one object, a project with its tasks
+        POST /projects, POST /tasks: add, the body gives name, deadline, description,
+            detailed_description and project for a task
+        PATCH /projects/<id>, PATCH /tasks/<id>: update the properties given in the body
+        DELETE /projects/<id>, DELETE /tasks/<id>: delete and update the related objects
+    The store is given by the server (server.store).
+    """
+
+    server: "Server"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.handle_request(
+            lambda store, collection, id_: (
+                store.get(collection, id_) if id_ else store.list(collection, query)
+            ),
+            url.path,
+        )
+
+    def do_POST(self):
+        body = self.read_body()
+        if body is None:
+            return self.send_json(400, {"error": "The body must be a JSON object"})
+        self.handle_request(
+            lambda store, collection, id_: store.change(collection, "add", None, body),
+            self.path,
+            status=201,
+            with_id=False,
+        )
+
+    def do_PATCH(self):
+        body = self.read_body()
+        if body is None:
+            return self.send_json(400, {"error": "The body must be a JSON object"})
+        self.handle_request(
+            lambda store, collection, id_: store.change(
+                collection, "update", id_, body
+            ),
+            self.path,
+            with_id=True,
+        )
+
+    def do_DELETE(self):
+        self.handle_request(
+            lambda store, collection, id_: store.change(collection, "delete", id_),
+            self.path,
+            status=204,
+            with_id=True,
+        )
+
+    def read_body(self) -> dict | None:
+        """
+        Returns:
+            dict | None: JSON object of the request body, None if it is not a JSON object
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return None
+        return body if isinstance(body, dict) else None
+
+    def handle_request(self, action, path: str, status=200, with_id=None) -> None:
+        """
+        Run the action on the store with the collection and the ID of the path, and send its result.
+        Args:
+            action (Callable[[Store, str, str | None], object]): action of the request
+            path (str): path of the request, /<collection> or /<collection>/<id>
+            status (int): status sent if the action succeeds
+            with_id (bool | None): True if the path must have an ID, False if it must not, None for both
+        """
+        parts = [part for part in urlparse(path).path.split("/") if part]
+        store: Store = self.server.store
+        with store.lock:
+            if (
+                not parts
+                or len(parts) > 2
+                or store.data_list(parts[0]) is None
+                or (with_id is not None and with_id != (len(parts) == 2))
+            ):
+                return self.send_json(404, {"error": "Not found"})
+            try:
+                result = action(store, parts[0], parts[1] if len(parts) == 2 else None)
+            except KeyError:
+                return self.send_json(404, {"error": "⚠️  No object with this ID ⚠️"})
+            except (ValueError, TypeError, AttributeError) as e:
+                return self.send_json(400, {"error": str(e) or "Invalid request"})
+        self.send_json(status, result)
+
+    def send_json(self, status: int, data) -> None:
+        """
+        Args:
+            status (int): HTTP status
+            data: object sent as JSON, nothing for the status 204
+        """
+        body = b"" if status == 204 else json.dumps(data, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # no log line for each request
+        ...
+
+
+class Server(ThreadingHTTPServer):
+    """
+    HTTP server of the projects and tasks, each request is handled in a thread.
+    Attributes:
+        store (Store): projects and tasks served
+    """
+
+    store: Store
+
+
+def make_server(host=HOST, port=PORT, store=None) -> Server:
+    """
+    Create the server, each request is handled in a thread.
+    Args:
+        host (str): address to listen on
+        port (int): port to listen on, 0 for any free port
+        store (Store | None): projects and tasks served, Store() if None
+    Returns:
+        Server: the server, started with serve_forever()
+    """
+    server = Server((host, port), RequestHandler)
+    server.store = store or Store()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="server.py", description="JSON API of the projects and tasks"
+    )
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+    server = make_server(args.host, args.port)
+    print(f"🟢  Serving the projects and tasks on http://{args.host}:{args.port} 🟢")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n👋👋  Goodbye! See you soon !!🙂\n")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,986 @@
+import atexit
+import csv
+import gc
+import heapq
+import io
+import json
+import marshal
+import math
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import threading
+from contextlib import closing, contextmanager
+from typing import TextIO
+
+try:
+    import fcntl
+except ImportError:
+    # no advisory locks (ie: on Windows), the files must be used by one program at a time
+    fcntl = None  # type: ignore[assignment]
+
+# Tables of the SQLite database. The task_list of a project is stored in the project_tasks join table
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    detailed_description TEXT,
+    creation_date TEXT,
+    deadline TEXT,
+    state TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_deadline ON projects (deadline);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    detailed_description TEXT,
+    creation_date TEXT,
+    deadline TEXT,
+    state TEXT,
+    linked_project INTEGER
+);
+CREATE INDEX IF NOT EXISTS tasks_deadline ON tasks (deadline);
+CREATE INDEX IF NOT EXISTS tasks_linked_project ON tasks (linked_project);
+CREATE TABLE IF NOT EXISTS project_tasks (
+    project_id INTEGER NOT NULL,
+    task_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (project_id, task_id)
+);
+CREATE INDEX IF NOT EXISTS project_tasks_task ON project_tasks (task_id);
+"""
+
+# Columns shared by the projects and tasks tables
+COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "detailed_description",
+    "creation_date",
+    "deadline",
+    "state",
+)
+
+
+class SqliteStorage:
+    """
+    Store projects and tasks in a SQLite database instead of csv files.
+    Each save only runs the INSERT/UPDATE/DELETE of the rows that changed.
+    Attributes:
+        database (str): Path to the SQLite database file, shared by projects and tasks
+    """
+
+    def __init__(self, database: str):
+        self.database = database
+
+    def exists(self) -> bool:
+        """
+        Returns:
+            bool: True if the database file exists
+        """
+        return os.path.exists(self.database)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Open the database, creating the directory, the tables and the indexes if needed.
+        Returns:
+            sqlite3.Connection: connection to the database
+        """
+        directory = os.path.dirname(self.database)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        connection = sqlite3.connect(self.database)
+        connection.executescript(SCHEMA)
+        return connection
+
+    def load(self, data_type: str) -> list:
+        """
+        Read all the rows of a table as dictionaries, in the same format as the csv files.
+        Args:
+            data_type (str): 'project' or 'task'
+        Returns:
+            list[dict]: rows ordered by id, task_list of projects is a list of task ids
+        """
+        return list(self.iter_rows(data_type))
+
+    def iter_rows(self, data_type: str):
+        """
+        Yield the rows of a table one at a time, without reading the whole table in memory.
+        Args:
+            data_type (str): 'project' or 'task'
+        Yields:
+            dict: row in the same format as the csv files, ordered by id
+        """
+        with closing(self.connect()) as connection:
+            if data_type == "project":
+                # the task ids of each project are concatenated in the order of their position
+                cursor = connection.execute(
+                    f"SELECT {', '.join(COLUMNS)}, "
+                    "(SELECT group_concat(task_id) FROM "
+                    "(SELECT task_id FROM project_tasks WHERE project_id = projects.id ORDER BY position)) "
+                    "FROM projects ORDER BY id"
+                )
+                for row in cursor:
+                    data = row_to_dict(row[:-1])
+                    data["task_list"] = row[-1].split(",") if row[-1] else []
+                    yield data
+            else:
+                cursor = connection.execute(
+                    f"SELECT {', '.join(COLUMNS)}, linked_project FROM tasks ORDER BY id"
+                )
+                for row in cursor:
+                    data = row_to_dict(row[:-1])
+                    data["linked_project"] = "" if row[-1] is None else str(row[-1])
+                    yield data
+
+    def save(self, data_type: str, objects: list, deleted_ids=()) -> None:
+        """
+        Insert or update the given objects and delete the given ids in a single transaction.
+        Args:
+            data_type (str): 'project' or 'task'
+            objects (list[DataType]): new or modified objects
+            deleted_ids (Iterable[str]): ids of the deleted objects
+        """
+        self.save_many([(data_type, objects, deleted_ids)])
+
+    def save_many(self, changes: list) -> None:
+        """
+        Save the changes of several tables in a single transaction.
+        Args:
+            changes (list[tuple]): (data_type, objects, deleted_ids) for each table, see self.save()
+        """
+        with closing(self.connect()) as connection:
+            with connection:  # commit, or rollback if an exception is raised
+                for data_type, objects, deleted_ids in changes:
+                    for id_ in deleted_ids:
+                        self.delete_row(connection, data_type, id_)
+                    for object_ in objects:
+                        self.upsert_row(connection, data_type, object_)
+
+    def replace_all(self, data_type: str, objects: list) -> None:
+        """
+        Replace all the rows of a table by the given objects.
+        Args:
+            data_type (str): 'project' or 'task'
+            objects (list[DataType]): all the objects of the table
+        """
+        with closing(self.connect()) as connection:
+            with connection:
+                connection.execute(f"DELETE FROM {data_type}s")
+                if data_type == "project":
+                    connection.execute("DELETE FROM project_tasks")
+                for object_ in objects:
+                    self.upsert_row(connection, data_type, object_)
+
+    @staticmethod
+    def upsert_row(connection: sqlite3.Connection, data_type: str, object_) -> None:
+        """
+        Insert the object, or update its row if the id already exists.
+        Args:
+            connection (sqlite3.Connection): connection with an open transaction
+            data_type (str): 'project' or 'task'
+            object_ (DataType): object to save
+        """
+        columns = list(COLUMNS)
+        values: list[int | str | None] = [int(object_.id)]
+        values += [str(getattr(object_, key)) for key in COLUMNS[1:]]
+        if data_type == "task":
+            columns.append("linked_project")
+            values.append(
+                int(object_.linked_project) if object_.linked_project else None
+            )
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+        connection.execute(
+            f"INSERT INTO {data_type}s ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}",
+            values,
+        )
+        if data_type == "project":
+            connection.execute(
+                "DELETE FROM project_tasks WHERE project_id = ?", (int(object_.id),)
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO project_tasks (project_id, task_id, position) VALUES (?, ?, ?)",
+                [
+                    (int(object_.id), int(task_id), position)
+                    for position, task_id in enumerate(object_.task_list)
+                ],
+            )
+
+    @staticmethod
+    def delete_row(connection: sqlite3.Connection, data_type: str, id_: str) -> None:
+        """
+        Delete the row of an object, and its task_list for a project.
+        Args:
+            connection (sqlite3.Connection): connection with an open transaction
+            data_type (str): 'project' or 'task'
+            id_ (str): id of the deleted object
+        """
+        connection.execute(f"DELETE FROM {data_type}s WHERE id = ?", (int(id_),))
+        if data_type == "project":
+            connection.execute(
+                "DELETE FROM project_tasks WHERE project_id = ?", (int(id_),)
+            )
+
+
+def row_to_dict(row: tuple) -> dict:
+    """
+    Convert a row of the shared columns to a dictionary of strings.
+    Args:
+        row (tuple): values in the order of COLUMNS
+    Returns:
+        dict: the row with the column names as keys
+    """
+    data = dict(zip(COLUMNS, row))
+    data["id"] = str(data["id"])
+    return data
+
+
+class Journal:
+    """
+    Write-ahead journal of the changes of a csv file.
+    Each change is appended as a JSON line, {"op": "put", "row": {...}} or {"op": "delete", "id": "..."},
+    and the file is fsynced so the change survives a crash.
+    With a group commit window, the changes appended by the threads during the window
+    share a single fsync, and each save waits for it with self.commit() before it is done.
+    Use get_journal() to share one journal by file between all the instances of Data.
+    Other programs can append to the journal or remove it (compaction), so it must be appended
+    with the exclusive lock of the csv file held: the file is opened again if it was replaced,
+    and the changes appended by the other programs are counted.
+    Attributes:
+        path (str): Path to the journal file
+        group_commit_window (float): seconds to wait before fsync, 0 to fsync at each append
+        count (int): number of changes in the journal, up to date after each append
+        counted (os.stat_result | None): journal file as it was when self.count was counted
+        appended (int): number of appends, synced (int): number of appends fsynced
+    """
+
+    def __init__(self, path: str, group_commit_window: float = 0.0):
+        self.path = path
+        self.group_commit_window = group_commit_window
+        self.count = 0
+        self.counted: os.stat_result | None = None
+        self.count_changes()
+        self.file: TextIO | None = None
+        self.appended = 0
+        self.synced = 0
+        self.syncing = False
+        self.lock = threading.Lock()
+        self.synced_changed = threading.Condition(self.lock)
+
+    def read(self) -> list:
+        """
+        Read the changes of the journal, a last line truncated by a crash is ignored.
+        Returns:
+            list[dict]: changes in the order they were appended
+        """
+        records = []
+        if os.path.exists(self.path):
+            with open(self.path, "r") as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+        return records
+
+    def append(self, records: list) -> None:
+        """
+        Append changes to the journal. They are fsynced now without a group commit window,
+        otherwise by self.commit(), which must be called before the save is done.
+        Args:
+            records (list[dict]): changes to append
+        """
+        if not records:
+            return
+        with self.lock:
+            file = self.open()
+            self.count_changes()
+            # one JSON line by change, json.dumps() escapes the new lines of the values
+            file.write(
+                "".join(json.dumps(record, default=str) + "\n" for record in records)
+            )
+            file.flush()
+            self.count += len(records)
+            self.counted = os.fstat(file.fileno())
+            self.appended += 1
+            if self.group_commit_window <= 0:
+                self.fsync()
+
+    def commit(self) -> None:
+        """
+        Wait until the changes appended so far are fsynced.
+        With a group commit window, the first thread waiting waits for the window, without the lock,
+        then fsyncs once for the changes appended meanwhile by the other threads, which wait for it.
+        Call it without the lock of the csv file, so the other threads can append during the window.
+        """
+        with self.synced_changed:
+            appended = self.appended
+            while self.synced < appended:
+                if self.syncing:
+                    self.synced_changed.wait()
+                    continue
+                self.syncing = True
+                try:
+                    self.synced_changed.wait(self.group_commit_window)
+                    self.fsync()
+                finally:
+                    self.syncing = False
+                    self.synced_changed.notify_all()
+
+    def count_changes(self) -> None:
+        """
+        Add to self.count the changes appended by the other programs since the last count,
+        reading only what they appended. The journal is counted again from its start when
+        it was replaced or emptied (compaction). The count only decides when to compact.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.count, self.counted = 0, None
+            return
+        counted = self.counted
+        if (
+            counted is None
+            or not os.path.samestat(counted, stat)
+            or stat.st_size < counted.st_size
+        ):
+            self.count, start = 0, 0
+        else:
+            start = counted.st_size
+        if stat.st_size > start:
+            with open(self.path, "rb") as file:
+                file.seek(start)
+                self.count += file.read(stat.st_size - start).count(b"\n")
+        self.counted = stat
+
+    def open(self) -> TextIO:
+        """
+        Give the file to append to, opened again if another program removed or replaced it
+        since it was opened, with self.lock held.
+        Returns:
+            TextIO: the journal file opened to append
+        """
+        if self.file is not None:
+            try:
+                replaced = not os.path.samestat(
+                    os.fstat(self.file.fileno()), os.stat(self.path)
+                )
+            except FileNotFoundError:
+                replaced = True
+            if replaced:
+                # the changes appended to the old file were written in the csv file by the compaction
+                os.fsync(self.file.fileno())
+                self.file.close()
+                self.file = None
+        if self.file is None:
+            self.file = open(self.path, "a")
+        return self.file
+
+    def sync(self) -> None:
+        """
+        fsync the changes appended since the last fsync.
+        """
+        with self.lock:
+            self.fsync()
+
+    def fsync(self) -> None:
+        """
+        fsync the changes appended since the last fsync, with self.lock held.
+        """
+        if self.file is not None:
+            os.fsync(self.file.fileno())
+        self.synced = self.appended
+        self.synced_changed.notify_all()
+
+    def reset(self) -> None:
+        """
+        Empty the journal, once its changes are written in the csv file.
+        """
+        self.sync()
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.count = 0
+            self.counted = None
+
+
+# journals by absolute path, shared by all the instances of Data
+JOURNALS: dict = {}
+
+
+def get_journal(path: str, group_commit_window: float = 0.0) -> Journal:
+    """
+    Get the journal of a file, opened once by process.
+    Args:
+        path (str): Path to the journal file
+        group_commit_window (float): seconds to wait before fsync, 0 to fsync at each append
+    Returns:
+        Journal: the journal of the file
+    """
+    key = os.path.abspath(path)
+    if key not in JOURNALS:
+        JOURNALS[key] = Journal(path, group_commit_window)
+    journal = JOURNALS[key]
+    journal.group_commit_window = group_commit_window
+    return journal
+
+
+@atexit.register
+def sync_journals() -> None:
+    """
+    fsync the changes not committed yet when the program ends (ie: a save interrupted by an error).
+    """
+    for journal in JOURNALS.values():
+        journal.sync()
+
+
+def replay(rows, records: list):
+    """
+    Apply the changes of a journal to the rows of the csv file.
+    Replaying changes already in the csv file gives the same rows, so a crash during
+    a compaction is safe. The rows are read one at a time.
+    Args:
+        rows (Iterable[dict]): rows of the csv file, in order
+        records (list[dict]): changes of the journal
+    Yields:
+        dict: rows with the changes, in the order of the csv file then the new rows
+    """
+    changes: dict = {}
+    for record in records:
+        if record["op"] == "put":
+            changes[record["row"]["id"]] = record["row"]
+        else:
+            changes[record["id"]] = None
+    for row in rows:
+        if row["id"] in changes:
+            row = changes.pop(row["id"])
+            if row is None:
+                continue
+        yield row
+    for row in changes.values():
+        if row is not None:
+            yield row
+
+
+# Version of the snapshot format, a snapshot written with another version is ignored
+SNAPSHOT_VERSION = 2
+# Signature (mtime, size, inode) of the csv file, written at the end of the snapshot
+SNAPSHOT_SIGNATURE = struct.Struct("<qqq")
+# Size in bytes of each marshal record of the snapshot, written before the record
+SNAPSHOT_RECORD_SIZE = struct.Struct("<Q")
+
+
+def snapshot_rows(fields: tuple, rows: list) -> list:
+    """
+    Convert rows to dictionaries of strings (lists for task_list) with the keys in the order of fields,
+    for marshal, which reads dictionaries as fast as tuples.
+    Args:
+        fields (tuple[str]): names of the columns
+        rows (list[dict]): rows of the csv file
+    Returns:
+        list[dict]: the rows with all the fields
+    """
+    snapshot = []
+    for row in rows:
+        values = {}
+        for field in fields:
+            value = row.get(field, "")
+            values[field] = value if isinstance(value, list) else str(value)
+        snapshot.append(values)
+    return snapshot
+
+
+def write_snapshot(
+    path: str, signature: tuple, fields: tuple, rows: list, indexes=None
+) -> None:
+    """
+    Write a binary snapshot of the rows of a csv file, read much faster than the csv file.
+    The snapshot is made of marshal records preceded by their size: (SNAPSHOT_VERSION, fields),
+    then (rows, indexes) records, and ends with the signature of the csv file it was made from.
+    The indexes built from the rows are written in the same record, so the strings they share
+    with the rows (ie: the ids) are written once and shared again when they are read.
+    Args:
+        path (str): Path to the snapshot file
+        signature (tuple): (mtime, size, inode) of the csv file
+        fields (tuple[str]): names of the columns
+        rows (list[dict]): rows of the csv file
+        indexes (dict | None): indexes of the rows, made only of the types marshal can write
+    """
+    # several programs reading the csv file can write its snapshot at the same time
+    temp_file = f"{path}.{os.getpid()}.tmp"
+    with open(temp_file, "wb") as file:
+        write_snapshot_record(file, (SNAPSHOT_VERSION, tuple(fields)))
+        write_snapshot_record(file, (snapshot_rows(fields, rows), indexes))
+        file.write(SNAPSHOT_SIGNATURE.pack(*signature))
+    os.replace(temp_file, path)
+
+
+def append_snapshot(
+    path: str, old_signature: tuple, signature: tuple, fields: tuple, rows: list
+) -> bool:
+    """
+    Add the rows appended to the csv file at the end of its snapshot, without rewriting it.
+    The record has no indexes, the indexes written before don't have the appended rows.
+    Args:
+        path (str): Path to the snapshot file
+        old_signature (tuple): signature of the csv file before the rows were appended
+        signature (tuple): signature of the csv file with the rows
+        fields (tuple[str]): names of the columns
+        rows (list[dict]): rows appended to the csv file
+    Returns:
+        bool: False if the snapshot doesn't exist or was not made from the csv file before the append
+    """
+    try:
+        with open(path, "r+b") as file:
+            file.seek(-SNAPSHOT_SIGNATURE.size, os.SEEK_END)
+            if SNAPSHOT_SIGNATURE.unpack(file.read()) != tuple(old_signature):
+                return False
+            file.seek(-SNAPSHOT_SIGNATURE.size, os.SEEK_END)
+            file.truncate()
+            write_snapshot_record(file, (snapshot_rows(fields, rows), None))
+            file.write(SNAPSHOT_SIGNATURE.pack(*signature))
+    except (OSError, struct.error):
+        return False
+    return True
+
+
+def write_snapshot_record(file, value) -> None:
+    """
+    Write a value with marshal, preceded by its size.
+    Args:
+        file (BinaryIO): snapshot file
+        value: value to write
+    """
+    record = marshal.dumps(value)
+    file.write(SNAPSHOT_RECORD_SIZE.pack(len(record)))
+    file.write(record)
+
+
+def read_snapshot(path: str, signature: tuple) -> tuple[list, dict | None] | None:
+    """
+    Read the rows of a snapshot, if it was made from the current version of the csv file.
+    Args:
+        path (str): Path to the snapshot file
+        signature (tuple): (mtime, size, inode) of the csv file
+    Returns:
+        tuple[list[dict], dict | None] | None: rows of the csv file and their indexes,
+            None for the indexes if rows were appended after them,
+            None if the snapshot is missing, outdated or invalid
+    """
+    try:
+        with open(path, "rb") as file:
+            content = file.read()
+        if SNAPSHOT_SIGNATURE.unpack(content[-SNAPSHOT_SIGNATURE.size :]) != tuple(
+            signature
+        ):
+            return None
+        records_view = memoryview(content)[: -SNAPSHOT_SIGNATURE.size]
+        records = []
+        position = 0
+        while position < len(records_view):
+            (size,) = SNAPSHOT_RECORD_SIZE.unpack_from(records_view, position)
+            position += SNAPSHOT_RECORD_SIZE.size
+            records.append(marshal.loads(records_view[position : position + size]))
+            position += size
+        version, _ = records[0]
+        if version != SNAPSHOT_VERSION:
+            return None
+        rows: list[dict] = []
+        indexes = None
+        for record_rows, indexes in records[1:]:
+            rows.extend(record_rows)
+    except (OSError, ValueError, EOFError, TypeError, IndexError, struct.error):
+        return None
+    return rows, indexes
+
+
+@contextmanager
+def paused_gc():
+    """
+    Pause the cyclic garbage collector during the block, while many objects are created
+    (ie: loading a snapshot): they have no reference cycles to free, but the collections
+    would go through all of them again and again.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class OffsetIndex:
+    """
+    Sidecar index of a csv file (ie: ./DB/tasks.csv.offsets) giving the position of each row,
+    to read a single row without parsing the whole file.
+    The index file starts with its version, the signature (mtime, size, inode) of the csv file
+    and the length of the header, followed by the (id, offset, length) of the rows sorted by id.
+    It is built again when the signature doesn't match the csv file anymore,
+    and searched with a binary search in a memory map, so a lookup doesn't depend on the file size.
+    Attributes:
+        path_file (str): Path to the csv file
+        path (str): Path to the index file
+    """
+
+    # version, signature of the csv file, length of the header
+    HEADER = struct.Struct("<Hqqqq")
+    # id, offset and length of a row
+    ENTRY = struct.Struct("<qqq")
+    VERSION = 1
+
+    def __init__(self, path_file: str):
+        self.path_file = path_file
+        self.path = path_file + ".offsets"
+
+    def read_row(self, signature: tuple, id_: str) -> dict | None:
+        """
+        Read the row of an id, building the index first if it is missing or outdated.
+        Args:
+            signature (tuple): (mtime, size, inode) of the csv file
+            id_ (str): id of the row
+        Returns:
+            dict | None: the row as read by csv.DictReader, None if there is no row with this id
+        """
+        try:
+            id_number = int(id_)
+        except ValueError:
+            return None
+        position = self.lookup(signature, id_number)
+        if position is None:
+            self.build(signature)
+            position = self.lookup(signature, id_number)
+            if position is None:
+                # the csv file changed while the index was built
+                return None
+        header_length, offset, length = position
+        if offset < 0:
+            return None
+        with open(self.path_file, "rb") as file:
+            header = file.read(header_length)
+            file.seek(offset)
+            record = file.read(length)
+        reader = csv.DictReader(io.StringIO((header + record).decode(), newline=""))
+        return next(reader, None)
+
+    def lookup(self, signature: tuple, id_: int) -> tuple | None:
+        """
+        Find the position of a row with a binary search in the index file.
+        Args:
+            signature (tuple): (mtime, size, inode) of the csv file
+            id_ (int): id of the row
+        Returns:
+            tuple | None: (header length, offset, length) of the row, offset -1 if the id is not in
+                the file, None if the index is missing or outdated
+        """
+        try:
+            with open(self.path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as index:
+                    version, *index_signature, header_length = self.HEADER.unpack_from(
+                        index, 0
+                    )
+                    if version != self.VERSION or tuple(index_signature) != tuple(
+                        signature
+                    ):
+                        return None
+                    low = 0
+                    high = (len(index) - self.HEADER.size) // self.ENTRY.size
+                    while low < high:
+                        middle = (low + high) // 2
+                        entry_id, offset, length = self.ENTRY.unpack_from(
+                            index, self.HEADER.size + middle * self.ENTRY.size
+                        )
+                        if entry_id == id_:
+                            return header_length, offset, length
+                        if entry_id < id_:
+                            low = middle + 1
+                        else:
+                            high = middle
+                    return header_length, -1, 0
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def build(self, signature: tuple) -> None:
+        """
+        Scan the csv file in a memory map and write the index file.
+        A row ends at a new line outside of a quoted value.
+        Args:
+            signature (tuple): (mtime, size, inode) of the csv file
+        """
+        entries = []
+        header_length = 0
+        with open(self.path_file, "rb") as file:
+            if os.fstat(file.fileno()).st_size:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    header_length = self.row_end(content, 0)
+                    position = header_length
+                    while position < len(content):
+                        end = self.row_end(content, position)
+                        comma = content.find(b",", position, end)
+                        try:
+                            entries.append(
+                                (int(content[position:comma]), position, end - position)
+                            )
+                        except ValueError:
+                            # blank or invalid line
+                            pass
+                        position = end
+        entries.sort()
+        # several programs reading the csv file can build its index at the same time
+        temp_file = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_file, "wb") as file:
+            file.write(self.HEADER.pack(self.VERSION, *signature, header_length))
+            file.write(b"".join(self.ENTRY.pack(*entry) for entry in entries))
+        os.replace(temp_file, self.path)
+
+    @staticmethod
+    def row_end(content, start: int) -> int:
+        """
+        Args:
+            content (mmap.mmap): content of the csv file
+            start (int): offset of the beginning of a row
+        Returns:
+            int: offset after the end of the row
+        """
+        end = start
+        while True:
+            new_line = content.find(b"\n", end)
+            if new_line == -1:
+                return len(content)
+            end = new_line + 1
+            # an even number of quotes: the new line is not in a quoted value
+            if content[start:end].count(b'"') % 2 == 0:
+                return end
+
+
+class TextIndex:
+    """
+    Inverted index of the words of the text properties (name, description, detailed_description),
+    to find the objects containing words without reading all their texts.
+    For each word, it gives the ids of the objects containing it and how many times.
+    It can be written next to the csv file (ie: ./DB/tasks.csv.words) with the signature of the file,
+    and read back instead of being built again while the file doesn't change.
+    Attributes:
+        postings (dict[str, dict[str, int]]): for each word, the number of times it is in each object by id
+    """
+
+    # Words of a text: letters and digits, in lower case
+    WORD = re.compile(r"\w+")
+    VERSION = 1
+
+    def __init__(self, postings=None):
+        self.postings: dict = postings if postings is not None else {}
+
+    @classmethod
+    def words(cls, text) -> list:
+        """
+        Args:
+            text (str): text of a property
+        Returns:
+            list[str]: words of the text in lower case, with repetitions
+        """
+        return cls.WORD.findall(str(text).lower()) if text else []
+
+    def add(self, id_: str, text) -> None:
+        """
+        Add the words of a text to the object.
+        Args:
+            id_ (str): id of the object
+            text (str): text of one of its properties
+        """
+        for word in self.words(text):
+            ids = self.postings.get(word)
+            if ids is None:
+                self.postings[word] = {id_: 1}
+            else:
+                ids[id_] = ids.get(id_, 0) + 1
+
+    def remove(self, id_: str, text) -> None:
+        """
+        Remove the words of a text from the object, the text must have been added with self.add().
+        Args:
+            id_ (str): id of the object
+            text (str): text of one of its properties
+        """
+        for word in self.words(text):
+            ids = self.postings.get(word)
+            if ids is None or id_ not in ids:
+                continue
+            if ids[id_] > 1:
+                ids[id_] -= 1
+            else:
+                del ids[id_]
+                if not ids:
+                    del self.postings[word]
+
+    def search(self, text: str, any_word=False, count=None, limit=None) -> list:
+        """
+        Find the objects containing all the words of a text (or any of them), ranked by relevance:
+        each word found adds its number of occurrences in the object multiplied by its rarity
+        (log(1 + count / number of objects containing the word)).
+        Args:
+            text (str): words to find
+            any_word (bool): True to find the objects containing any of the words (OR),
+                False for the objects containing all of them (AND)
+            count (int | None): number of objects indexed, the number of ids in the index if None
+            limit (int | None): maximum number of results
+        Returns:
+            list[tuple[str, float]]: (id, score) of the objects found, the most relevant first,
+                by id for the same score
+        """
+        words = set(self.words(text))
+        postings = [self.postings.get(word, {}) for word in words]
+        if not postings or (not any_word and not all(postings)):
+            return []
+        if count is None:
+            count = len(set().union(*postings)) or 1
+        scores: dict = {}
+        if any_word:
+            for ids in postings:
+                rarity = math.log(1 + count / len(ids)) if ids else 0
+                for id_, occurrences in ids.items():
+                    scores[id_] = scores.get(id_, 0) + occurrences * rarity
+        else:
+            # intersect starting with the rarest word
+            postings.sort(key=len)
+            found = set(postings[0])
+            for ids in postings[1:]:
+                found.intersection_update(ids)
+                if not found:
+                    return []
+            for ids in postings:
+                rarity = math.log(1 + count / len(ids))
+                for id_ in found:
+                    scores[id_] = scores.get(id_, 0) + ids[id_] * rarity
+        key = lambda item: (-item[1], int(item[0]))
+        if limit is not None:
+            return heapq.nsmallest(limit, scores.items(), key=key)
+        return sorted(scores.items(), key=key)
+
+    def write(self, path: str, signature: tuple) -> None:
+        """
+        Write the index with marshal, for the version of the csv file it was built from.
+        Args:
+            path (str): Path to the index file
+            signature (tuple): signature of the csv file
+        """
+        # several programs reading the csv file can write its index at the same time
+        temp_file = f"{path}.{os.getpid()}.tmp"
+        with open(temp_file, "wb") as file:
+            file.write(marshal.dumps((self.VERSION, tuple(signature), self.postings)))
+        os.replace(temp_file, path)
+
+    @classmethod
+    def read(cls, path: str, signature: tuple) -> "TextIndex | None":
+        """
+        Read an index written with self.write(), if it was built from the current version of the csv file.
+        Args:
+            path (str): Path to the index file
+            signature (tuple): signature of the csv file
+        Returns:
+            TextIndex | None: the index, None if the file is missing, outdated or invalid
+        """
+        try:
+            with open(path, "rb") as file:
+                version, index_signature, postings = marshal.loads(file.read())
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        if version != cls.VERSION or index_signature != tuple(signature):
+            return None
+        return cls(postings)
+
+
+class FileLock:
+    """
+    Advisory lock of a csv file shared by several programs, taken with fcntl.flock() on a lock file
+    next to it (ie: ./DB/tasks.csv.lock), because the csv file itself is replaced at each write.
+    The lock is shared for reading, so the readers never block each other,
+    and exclusive for writing. It is reentrant in a program, use get_lock() to share it.
+    Attributes:
+        path (str): Path to the lock file
+        depth (int): number of nested shared() and exclusive() blocks
+        is_exclusive (bool): True if the lock is held exclusive
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file: TextIO | None = None
+        self.depth = 0
+        self.is_exclusive = False
+        self.thread_lock = threading.RLock()
+
+    def shared(self):
+        """
+        Returns:
+            ContextManager: block during which no other program writes the file
+        """
+        return self.hold(False)
+
+    def exclusive(self):
+        """
+        Returns:
+            ContextManager: block during which no other program reads or writes the file
+        """
+        return self.hold(True)
+
+    @contextmanager
+    def hold(self, exclusive: bool):
+        """
+        Take the lock for the block, it is released at the end of the outer block.
+        Args:
+            exclusive (bool): True for writing, False for reading
+        """
+        with self.thread_lock:
+            if fcntl is None:
+                yield
+                return
+            upgraded = False
+            if self.file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.file = open(self.path, "a")
+                fcntl.flock(self.file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                self.is_exclusive = exclusive
+            elif exclusive and not self.is_exclusive:
+                fcntl.flock(self.file, fcntl.LOCK_EX)
+                self.is_exclusive = upgraded = True
+            file = self.file
+            self.depth += 1
+            try:
+                yield
+            finally:
+                self.depth -= 1
+                if upgraded:
+                    fcntl.flock(file, fcntl.LOCK_SH)
+                    self.is_exclusive = False
+                if self.depth == 0:
+                    fcntl.flock(file, fcntl.LOCK_UN)
+                    file.close()
+                    self.file = None
+
+
+# locks by absolute path, shared by all the instances of Data
+LOCKS: dict = {}
+
+
+def get_lock(path: str) -> FileLock:
+    """
+    Get the lock of a file, created once by process.
+    Args:
+        path (str): Path to the lock file
+    Returns:
+        FileLock: the lock of the file
+    """
+    key = os.path.abspath(path)
+    if key not in LOCKS:
+        LOCKS[key] = FileLock(path)
+    return LOCKS[key]
@@ -1,12 +1,45 @@
 import pytest
 from tabulate import tabulate
 from controller import *
-from project import add_data, update_data, delete_data, view_all, view_single_data
+from project import (
+    add_data,
+    update_data,
+    delete_data,
+    view_all,
+    view_single_data,
+    new_id,
+    view_page,
+    browse_pages,
+    import_data,
+    print_import_report,
+    command_line,
+    query_data,
+    search_data,
+    due_data,
+    report_data,
+    is_valid_deadline,
+)
 from datetime import date, timedelta
+import sqlite3
+from storage import (
+    JOURNALS,
+    Journal,
+    OffsetIndex,
+    TextIndex,
+    get_journal,
+    read_snapshot,
+)
+from server import Store, make_server
+import json
+import multiprocessing
+import threading
+import urllib.error
+import urllib.request
 
 # this file was reformated by black module
 PROJECT_CSV = "temp_projects.csv"
 TASK_CSV = "temp_tasks.csv"
+DATABASE = "temp_data.db"
 
 
 def simulate_input(monkeypatch, inputs):
@@ -31,6 +64,14 @@ def clean_csv_files():
         os.remove(PROJECT_CSV)
     if os.path.exists(TASK_CSV):
         os.remove(TASK_CSV)
+    if os.path.exists(DATABASE):
+        os.remove(DATABASE)
+    for journal in JOURNALS.values():
+        journal.reset()
+    for path_file in [PROJECT_CSV, TASK_CSV]:
+        for extension in [".snapshot", ".offsets", ".lock", ".words"]:
+            if os.path.exists(path_file + extension):
+                os.remove(path_file + extension)
 
 
 def test_project_add(monkeypatch):
@@ -42,7 +83,7 @@ def test_project_add(monkeypatch):
         "Test Project",  # name
         "A test project description",  # description
         "Detailed test project description",  # detailed description
-        "2025-12-31",  # deadline
+        "2099-12-31",  # deadline
     ]
 
     # Simulate inputs
@@ -63,7 +104,7 @@ def test_project_add(monkeypatch):
     assert added_project["name"] == "Test Project"
     assert added_project["description"] == "A test project description"
     assert added_project["state"] == "To do"
-    assert added_project["deadline"] == "2025-12-31"
+    assert added_project["deadline"] == "2099-12-31"
     clean_csv_files()
 
 
@@ -80,7 +121,7 @@ def test_project_update(monkeypatch):
         "Test Project",  # name
         "A test project description",  # description
         "Detailed test project description",  # detailed description
-        "2025-12-31",  # deadline
+        "2099-12-31",  # deadline
     ]
     simulate_input(monkeypatch, add_inputs)
     add_data(project_list)
@@ -116,7 +157,7 @@ def test_project_delete(monkeypatch):
         "Test Project",  # name
         "A test project description",  # description
         "Detailed test project description",  # detailed description
-        "2025-12-31",  # deadline
+        "2099-12-31",  # deadline
     ]
     simulate_input(monkeypatch, add_inputs)
     add_data(project_list)
@@ -343,7 +384,7 @@ def test_is_valid_deadline(monkeypatch, capsys):
     )
     assert "⚠️ 3 wrong attempt start again ⚠️" in captured.out
 
-    #add a valid project deadline
+    # add a valid project deadline
     inputs = [
         "Test Project",  # name
         "A test project description",  # description
@@ -354,7 +395,7 @@ def test_is_valid_deadline(monkeypatch, capsys):
     # Simulate inputs
     simulate_input(monkeypatch, inputs)
     add_data(project_list)
-    #data for testing the update project function (invalid deadline)
+    # data for testing the update project function (invalid deadline)
     inputs = [
         "1",  # project id to update
         "deadline",  # property to update
@@ -363,7 +404,6 @@ def test_is_valid_deadline(monkeypatch, capsys):
         "2025-31-12",  # not a valid deadline in YYYY-DD-MM format
     ]
 
-
     # Simulate inputs
     simulate_input(monkeypatch, inputs)
 
@@ -371,10 +411,1399 @@ def test_is_valid_deadline(monkeypatch, capsys):
     update_data(project_list, task_list)
     captured = capsys.readouterr()
     assert (
-            "⚠️ Deadline must be today or later, and in the format (YYYY-MM-DD, e.g., 2025-01-30) ⚠️"
-            in captured.out
+        "⚠️ Deadline must be today or later, and in the format (YYYY-MM-DD, e.g., 2025-01-30) ⚠️"
+        in captured.out
     )
     assert "⚠️ 3 wrong attempt start again ⚠️" in captured.out
 
+    # the date of today is taken at each check, not when the program started
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.today() + timedelta(days=1)
+
+    monkeypatch.setattr("project.date", Tomorrow)
+    assert not is_valid_deadline(f"{date.today()}")
+    assert is_valid_deadline(f"{date.today() + timedelta(days=1)}")
+
+    clean_csv_files()
+
+
+def test_get_object_index():
+    """
+    get_object must use the id index, kept in sync by get_objects, add_object and delete_object.
+    """
+    task_list = Tasks(TASK_CSV)
+    task_list.data = [
+        {
+            "id": str(i),
+            "name": f"Task {i}",
+            "description": "",
+            "detailed_description": "",
+            "creation_date": f"{date.today()}",
+            "deadline": f"{date.today()}",
+            "state": "To do",
+            "linked_project": "",
+        }
+        for i in range(1, 4)
+    ]
+    task_list.get_objects()
+    assert task_list.get_object("2").name == "Task 2"
+
+    task_list.delete_object(task_list.get_object("2"))
+    with pytest.raises(ValueError, match="No task with this ID"):
+        task_list.get_object("2")
+
+    task_list.add_object(dict(task_list.data[0], id="4", name="Task 4"))
+    assert task_list.get_object("4") is task_list.objects[-1]
+
+
+def make_rows(data_type, count, **values):
+    """
+    Build a list of dictionaries in the csv format for projects or tasks.
+    Args:
+        data_type (str): 'project' or 'task'
+        count (int): number of rows, ids start at 1
+        values: properties overriding the default values
+    Returns:
+        list[dict]: rows ready for data_to_csv
+    """
+    rows = []
+    for i in range(1, count + 1):
+        row = {
+            "id": str(i),
+            "name": f"{data_type} {i}",
+            "description": f"{data_type} {i} description",
+            "detailed_description": f"{data_type} {i} detailed description",
+            "creation_date": f"{date.today()}",
+            "deadline": f"{date.today() + timedelta(days=i)}",
+            "state": "To do",
+        }
+        if data_type == "project":
+            row["task_list"] = []
+        else:
+            row["linked_project"] = ""
+        row.update(values)
+        rows.append(row)
+    return rows
+
+
+def test_delete_project_unlinks_all_tasks(monkeypatch):
+    """
+    Relationship lookups are exact (project 1 doesn't match 12) and the delete cascade unlinks every task.
+    """
+    project_list = Projects(PROJECT_CSV)
+    task_list = Tasks(TASK_CSV)
+    project_list.data = make_rows("project", 12)
+    project_list.data[0]["task_list"] = ["1", "2"]
+    project_list.data[11]["task_list"] = ["3"]
+    project_list.data_to_csv()
+    task_list.data = make_rows("task", 3, linked_project="1")
+    task_list.data[2]["linked_project"] = "12"
+    task_list.data_to_csv()
+
+    task_list.data_from_csv()
+    linked = task_list.get_objects_by_property_value("linked_project", "1")
+    assert sorted(task.id for task in linked) == ["1", "2"]
+    project_list.data_from_csv()
+    assert project_list.get_object_by_property_value("task_list", "3").id == "12"
+
+    simulate_input(monkeypatch, ["1", "yes"])
+    delete_data(project_list, task_list)
+    task_list.data_from_csv()
+    assert [task.linked_project for task in task_list.objects] == ["", "", "12"]
+    assert task_list.get_objects_by_property_value("linked_project", "1") == []
+    clean_csv_files()
+
+
+def test_add_data_appends_row(monkeypatch):
+    """
+    Adding a record appends one row to the csv file and never rewrites the whole file.
+    """
+    project_list = Projects(PROJECT_CSV)
+    deadline = f"{date.today() + timedelta(days=30)}"
+
+    def no_rewrite(self):
+        raise AssertionError("add_data must not rewrite the whole file")
+
+    monkeypatch.setattr(Data, "data_to_csv", no_rewrite)
+    for name in ["First", "Second"]:
+        simulate_input(monkeypatch, [name, "short", "detailed", deadline])
+        add_data(project_list)
+
+    with open(PROJECT_CSV) as file:
+        lines = file.read().splitlines()
+    assert lines[0] == (
+        "id,name,description,detailed_description,creation_date,deadline,state,task_list"
+    )
+    assert len(lines) == 3
+    project_list.data_from_csv()
+    assert [project.name for project in project_list.objects] == ["First", "Second"]
+    assert project_list.get_all_ids() == [1, 2]
+
+    # the last line of a file edited by hand may have no new line
+    with open(PROJECT_CSV, "rb") as file:
+        content = file.read()
+    with open(PROJECT_CSV, "wb") as file:
+        file.write(content.rstrip(b"\r\n"))
+    simulate_input(monkeypatch, ["Third", "short", "detailed", deadline])
+    add_data(Projects(PROJECT_CSV))
+    Data.cache.clear()
+    os.remove(PROJECT_CSV + ".snapshot")
+    project_list.data_from_csv()
+    assert [project.name for project in project_list.objects] == [
+        "First",
+        "Second",
+        "Third",
+    ]
+    assert [project.task_list for project in project_list.objects] == [[], [], []]
+    clean_csv_files()
+
+
+def test_data_from_csv_cache(monkeypatch):
+    """
+    An unchanged file is parsed once and its objects are shared by all instances.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 3)
+    project_list.data_to_csv()
+
+    misses = Data.cache_misses
+    hits = Data.cache_hits
+    Projects(PROJECT_CSV).data_from_csv()
+    second_list = Projects(PROJECT_CSV)
+    second_list.data_from_csv()
+    assert Data.cache_misses == misses + 1
+    assert Data.cache_hits == hits + 1
+
+    # a change through the controller keep the cache valid for the new version
+    second_list.update_object(second_list.get_object("1"), "name", "Renamed")
+    second_list.save()
+    third_list = Projects(PROJECT_CSV)
+    third_list.data_from_csv()
+    assert third_list.get_object("1").name == "Renamed"
+    assert Data.cache_misses == misses + 1
+
+    # a change of the file by another program is detected
+    with open(PROJECT_CSV, "a", newline="") as file:
+        file.write(f"4,Added,d,d,{date.today()},{date.today()},To do,[]\r\n")
+    third_list.data_from_csv()
+    assert Data.cache_misses == misses + 2
+    assert third_list.get_object("4").name == "Added"
+
+    # an object added in the menu has the same types as the objects read from the file
+    simulate_input(monkeypatch, ["Fifth", "short", "detailed", f"{date.today()}"])
+    add_data(third_list)
+    fourth_list = Projects(PROJECT_CSV)
+    fourth_list.data_from_csv()
+    assert fourth_list.get_object("5").creation_date == date.today().isoformat()
+    assert fourth_list.query(order_by="-creation_date")[0].id == "5"
+
+    # the file emptied through the controller is empty for the next loading too
+    for object_ in list(third_list.objects):
+        third_list.delete_object(object_)
+    with pytest.raises(ValueError, match="no data now"):
+        third_list.save()
+    for data_list in [third_list, Projects(PROJECT_CSV)]:
+        with pytest.raises(ValueError, match="The file for your projects is empty"):
+            data_list.data_from_csv()
+        assert data_list.data == []
+    clean_csv_files()
+
+
+def test_sqlite_storage(monkeypatch):
+    """
+    Migrate the csv files to SQLite, then update and delete with single row statements.
+    """
+    project_list = Projects(PROJECT_CSV, "csv")
+    project_list.data = make_rows("project", 2)
+    project_list.data[0]["task_list"] = ["1", "2"]
+    project_list.data_to_csv()
+    task_list = Tasks(TASK_CSV, "csv")
+    task_list.data = make_rows("task", 3, linked_project="1")
+    task_list.data[2]["linked_project"] = ""
+    task_list.data_to_csv()
+    migrate_csv_to_sqlite(PROJECT_CSV, TASK_CSV, DATABASE)
+
+    project_list = Projects(PROJECT_CSV, "sqlite", DATABASE)
+    task_list = Tasks(TASK_CSV, "sqlite", DATABASE)
+    project_list.data_from_csv()
+    assert project_list.get_object("1").task_list == ["1", "2"]
+    assert task_list.data_from_csv()[2]["linked_project"] == ""
+
+    task_list.update_object(task_list.get_object("3"), "state", "Completed")
+    assert task_list.changed == {"3"}
+    task_list.save()
+    assert (
+        Tasks(TASK_CSV, "sqlite", DATABASE).data_from_csv()[2]["state"] == "Completed"
+    )
+
+    # deleting the project unlinks its tasks in the database too
+    simulate_input(monkeypatch, ["1", "yes"])
+    delete_data(project_list, task_list)
+    assert Projects(PROJECT_CSV, "sqlite", DATABASE).get_all_ids() == []
+    projects = Projects(PROJECT_CSV, "sqlite", DATABASE)
+    assert projects.data_from_csv()[0]["id"] == "2"
+    tasks = Tasks(TASK_CSV, "sqlite", DATABASE)
+    tasks.data_from_csv()
+    assert [task.linked_project for task in tasks.objects] == ["", "", ""]
+
+    with sqlite3.connect(DATABASE) as connection:
+        indexes = {
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+    assert {"tasks_deadline", "tasks_linked_project", "projects_deadline"} <= indexes
+    clean_csv_files()
+
+
+def test_iter_objects_streaming(monkeypatch):
+    """
+    Above the stream threshold the objects are read row by row and never loaded in memory.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 5)
+    project_list.data_to_csv()
+    monkeypatch.setattr(Data, "stream_threshold", 0)
+
+    project_list = Projects(PROJECT_CSV)
+    assert [project.id for project in project_list.iter_objects()] == [
+        "1",
+        "2",
+        "3",
+        "4",
+        "5",
+    ]
+    assert project_list.find_object("4").name == "project 4"
+    selected = project_list.iter_objects(lambda project: project.id in ["2", "3"])
+    assert [project.id for project in selected] == ["2", "3"]
+    assert "project 5" in view_all(project_list)
+    # nothing was loaded in memory
+    assert project_list.objects == []
+    with pytest.raises(ValueError, match="No project with this ID"):
+        project_list.find_object("6")
+    clean_csv_files()
+
+
+def test_slotted_models():
+    """
+    Models have no __dict__ and fields give the displayed properties in order.
+    """
+    task = Task()
+    assert not hasattr(task, "__dict__")
+    assert Task.fields == tuple(task.convert_to_dict().keys())
+    assert Project.fields[-1] == "task_list"
+    with pytest.raises(AttributeError):
+        task.unknown = "value"
+
+
+def test_task_list_encoding():
+    """
+    task_list is written as ids separated by |, files with python list representations are still read
+    and migrate_task_list_encoding rewrite them.
+    """
+    with open(PROJECT_CSV, "w", newline="") as file:
+        file.write(
+            "id,name,description,detailed_description,creation_date,deadline,state,task_list\r\n"
+            f"1,Old,d,d,{date.today()},{date.today()},To do,\"['1', '2']\"\r\n"
+            f"2,Empty,d,d,{date.today()},{date.today()},To do,[]\r\n"
+        )
+    project_list = Projects(PROJECT_CSV)
+    project_list.data_from_csv()
+    assert project_list.get_object("1").task_list == ["1", "2"]
+    assert project_list.get_object("2").task_list == []
+
+    migrate_task_list_encoding(PROJECT_CSV)
+    with open(PROJECT_CSV) as file:
+        lines = file.read().splitlines()
+    assert lines[1].endswith(",To do,1|2")
+    assert lines[2].endswith(",To do,")
+    assert decode_task_list("1|2") == ["1", "2"]
+    assert encode_task_list(["1", "2"]) == "1|2"
+    clean_csv_files()
+
+
+def test_id_allocator():
+    """
+    The lowest free id is reused, whatever the order of the deletions.
+    """
+    allocator = IdAllocator([1, 2, 4, 5, 7])
+    assert allocator.allocate() == 3
+    assert allocator.allocate() == 6
+    assert allocator.allocate() == 8
+    allocator.release(5)
+    allocator.release(2)
+    assert allocator.peek() == 2
+    allocator.reserve(2)
+    assert allocator.allocate() == 5
+    allocator.reserve(12)
+    assert allocator.allocate() == 9
+
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 3)
+    task_list.get_objects()
+    assert new_id(task_list) == "4"
+    task_list.delete_object(task_list.get_object("2"))
+    assert new_id(task_list) == "2"
+    task_list.add_object(dict(task_list.data[0], id="2"))
+    assert new_id(task_list) == "4"
+
+
+def test_view_page(monkeypatch, capsys):
+    """
+    Only the objects of the page are read and displayed, with navigation between pages.
+    """
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 25)
+    task_list.data_to_csv()
+
+    table, has_next = view_page(task_list, 1, 10)
+    assert "task 10" in table and "task 11" not in table
+    assert has_next
+    table, has_next = view_page(task_list, 3, 10)
+    assert "task 25" in table and "task 20" not in table
+    assert not has_next
+    assert "detailed_description" not in table
+    assert view_page(task_list, 4, 10) == ("⚠️  No task on page 4 ⚠️", False)
+
+    # the file is read only until the end of the page
+    read_rows = []
+
+    def iter_rows(self):
+        for row in make_rows("task", 25):
+            read_rows.append(row)
+            yield row
+
+    monkeypatch.setattr(Data, "cache", {})
+    monkeypatch.setattr(Data, "stream_threshold", 0)
+    monkeypatch.setattr(Data, "iter_rows", iter_rows)
+    view_page(Tasks(TASK_CSV), 1, 10)
+    assert len(read_rows) == 11
+
+    simulate_input(monkeypatch, ["n", "n", "n", "p", "1", ""])
+    browse_pages(Tasks(TASK_CSV), 10)
+    captured = capsys.readouterr()
+    assert "This is the last page" in captured.out
+    assert captured.out.count("Page 2") == 2
+    clean_csv_files()
+
+
+def test_view_single_project_tasks(monkeypatch):
+    """
+    The tasks of a project are joined from the given Tasks, in the order of the task_list.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 1, task_list=["3", "1", "9"])
+    project_list.data_to_csv()
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 4, linked_project="1")
+    task_list.data_to_csv()
+
+    task_list.data_from_csv()
+    project_list.data_from_csv()
+    project = project_list.get_object("1")
+    assert [task.id for task in project_list.tasks_for(project, task_list)] == [
+        "3",
+        "1",
+    ]
+
+    simulate_input(monkeypatch, ["1"])
+    result = view_single_data(project_list, task_list)
+    assert "Project Tasks:" in result
+    assert result.index("task 3") < result.index("task 1 ")
+    assert "task 2" not in result
+
+    # streamed tasks give the same result
+    monkeypatch.setattr(Data, "cache", {})
+    monkeypatch.setattr(Data, "stream_threshold", 0)
+    streamed = project_list.tasks_for(project, Tasks(TASK_CSV))
+    assert [task.id for task in streamed] == ["3", "1"]
+    clean_csv_files()
+
+
+def test_available_tasks_update(monkeypatch, capsys):
+    """
+    The available tasks follow the links added and removed in the task_list of projects.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 2)
+    project_list.data[0]["task_list"] = ["1"]
+    project_list.data_to_csv()
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 4)
+    task_list.data[0]["linked_project"] = "1"
+    task_list.data_to_csv()
+
+    simulate_input(monkeypatch, ["2", "task_list", "3"])
+    update_data(project_list, task_list)
+    assert "['2: task 2', '3: task 3', '4: task 4']" in capsys.readouterr().out
+    assert project_list.available_task_ids(task_list) == ["2", "4"]
+    assert sorted(project_list.used_task_ids()) == ["1", "3"]
+
+    # a task used by another project can't be added
+    simulate_input(monkeypatch, ["1", "task_list", "3", "4"])
+    update_data(project_list, task_list)
+    assert "already used in other project" in capsys.readouterr().out
+    assert project_list.available_task_ids(task_list) == ["2"]
+
+    # removing a task makes it available again
+    simulate_input(monkeypatch, ["2", "task_list", "3", "yes"])
+    update_data(project_list, task_list)
+    assert project_list.available_task_ids(task_list) == ["2", "3"]
+    assert Tasks(TASK_CSV).find_object("3").linked_project == ""
+    clean_csv_files()
+
+
+def test_session(monkeypatch):
+    """
+    A Session writes each changed file once at the end, and undoes the changes on error.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 2)
+    project_list.data_to_csv()
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 3)
+    task_list.data_to_csv()
+    project_list.data_from_csv()
+    task_list.data_from_csv()
+
+    written = []
+    write_temp_csv = Data.write_temp_csv
+
+    def count_writes(self):
+        written.append(self.data_type)
+        return write_temp_csv(self)
+
+    monkeypatch.setattr(Data, "write_temp_csv", count_writes)
+    with Session(project_list, task_list):
+        for task_id in ["1", "2", "3"]:
+            project = project_list.get_object("1")
+            project_list.update_object(
+                project, "task_list", project.task_list + [task_id]
+            )
+            task_list.update_object(
+                task_list.get_object(task_id), "linked_project", "1"
+            )
+    assert sorted(written) == ["project", "task"]
+    assert Projects(PROJECT_CSV).find_object("1").task_list == ["1", "2", "3"]
+    assert not os.path.exists(PROJECT_CSV + ".tmp")
+
+    with open(TASK_CSV) as file:
+        before = file.read()
+    with pytest.raises(ValueError, match="canceled"):
+        with Session(project_list, task_list):
+            task_list.delete_object(task_list.get_object("2"))
+            task_list.update_object(task_list.get_object("1"), "name", "Renamed")
+            task_list.add_object(dict(task_list.data[0], id="2", name="New"))
+            raise ValueError("canceled")
+    with open(TASK_CSV) as file:
+        assert file.read() == before
+    assert [task.name for task in task_list.objects] == ["task 1", "task 2", "task 3"]
+    assert task_list.get_object("2").name == "task 2"
+    assert task_list.get_objects_by_property_value("linked_project", "1")
+    assert not task_list.changed and not task_list.deleted
+    assert new_id(task_list) == "4"
+    clean_csv_files()
+
+
+def test_journal_storage(monkeypatch):
+    """
+    The journal storage appends the changes to a journal, replays it when loading
+    and rewrites the CSV file when the journal has too many changes.
+    """
+    monkeypatch.setattr(Data, "cache", {})
+    task_list = Tasks(TASK_CSV, storage="journal")
+    for row in make_rows("task", 3):
+        task_list.add_object(row)
+    task_list.save()
+    assert not os.path.exists(TASK_CSV)
+    task_list.update_object(task_list.get_object("2"), "name", "Renamed")
+    task_list.delete_object(task_list.get_object("3"))
+    task_list.save()
+    assert task_list.journal.count == 5
+
+    Data.cache.clear()
+    reloaded = Tasks(TASK_CSV, storage="journal")
+    reloaded.data_from_csv()
+    assert [task.name for task in reloaded.objects] == ["task 1", "Renamed"]
+    assert [row["id"] for row in reloaded.iter_rows()] == ["1", "2"]
+
+    monkeypatch.setattr(Data, "journal_compact_threshold", 6)
+    reloaded.update_object(reloaded.get_object("1"), "state", "Done")
+    reloaded.save()
+    assert not os.path.exists(reloaded.journal.path)
+    with open(TASK_CSV) as file:
+        assert len(file.readlines()) == 3
+    Data.cache.clear()
+    reloaded.data_from_csv()
+    assert reloaded.get_object("1").state == "Done"
+
+    # the saves of the threads during the window share one fsync, and each save waits for it
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: fsyncs.append(fd) or real_fsync(fd))
+    journal = get_journal("temp.journal", 0.2)
+    barrier = threading.Barrier(4)
+    committed = []
+
+    def save(id_):
+        barrier.wait()
+        journal.append([{"op": "delete", "id": id_}])
+        journal.commit()
+        committed.append(len(fsyncs))
+
+    threads = [threading.Thread(target=save, args=(str(i),)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fsyncs) == 1 and committed == [1, 1, 1, 1]
+    assert len(journal.read()) == 4 and journal.count == 4
+
+    # the changes appended by another program are counted, and counted again after its compaction
+    other = Journal("temp.journal")
+    other.append([{"op": "delete", "id": "5"}, {"op": "delete", "id": "6"}])
+    journal.append([{"op": "delete", "id": "7"}])
+    assert journal.count == 7
+    other.reset()
+    journal.append([{"op": "delete", "id": "8"}])
+    assert journal.count == 1 and journal.read() == [{"op": "delete", "id": "8"}]
+    journal.reset()
+    clean_csv_files()
+
+
+def test_cascade():
+    """
+    Cascade deletes several objects by ids or filter and updates all their related objects at once.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 3)
+    project_list.data[0]["task_list"] = ["1", "2", "3"]
+    project_list.data[1]["task_list"] = ["4"]
+    project_list.data_to_csv()
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 5)
+    for task in task_list.data:
+        task["linked_project"] = "1" if task["id"] in ["1", "2", "3"] else "2"
+    task_list.data_to_csv()
+
+    assert Cascade(Tasks(TASK_CSV), Projects(PROJECT_CSV)).delete(["2", "4", "2"]) == [
+        "2",
+        "4",
+    ]
+    project_list.data_from_csv()
+    assert [project.task_list for project in project_list.objects] == [
+        ["1", "3"],
+        [],
+        [],
+    ]
+
+    task_list = Tasks(TASK_CSV)
+    deleted = Cascade(Projects(PROJECT_CSV), task_list).delete(
+        filter_=lambda project: project.id in ["1", "2"]
+    )
+    assert deleted == ["1", "2"]
+    assert [row["id"] for row in Projects(PROJECT_CSV).data_from_csv()] == ["3"]
+    assert [task.linked_project for task in Tasks(TASK_CSV).iter_objects()] == [
+        "",
+        "",
+        "",
+    ]
+
+    with pytest.raises(ValueError):
+        Cascade(Projects(PROJECT_CSV), Tasks(TASK_CSV)).delete(["3", "7"])
+    assert [row["id"] for row in Projects(PROJECT_CSV).data_from_csv()] == ["3"]
+    clean_csv_files()
+
+
+def test_import_data(monkeypatch, capsys):
+    """
+    import_data validates the rows, allocates the ids at once, links the tasks and writes each file once.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 2)
+    project_list.data_to_csv()
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 3)
+    task_list.data_to_csv()
+    task_list.data_from_csv()
+    task_list.delete_object(task_list.get_object("2"))
+    task_list.save()
+
+    import_file = "temp_import.jsonl"
+    with open(import_file, "w") as file:
+        file.write('{"name": "a", "deadline": "2030-01-01", "linked_project": "1"}\n')
+        file.write('{"name": "b", "deadline": "2020-01-01"}\n')
+        file.write("not json\n")
+        file.write('{"name": "c", "deadline": "2030-01-01", "linked_project": "9"}\n')
+        file.write('{"name": "d", "deadline": "2030-02-01", "linked_project": "1"}\n')
+        file.write('{"name": "e", "deadline": "2030-02-01"}\n')
+
+    written = []
+    write_temp_csv = Data.write_temp_csv
+
+    def count_writes(self):
+        written.append(self.data_type)
+        return write_temp_csv(self)
+
+    monkeypatch.setattr(Data, "write_temp_csv", count_writes)
+    report = import_data(
+        Tasks(TASK_CSV), import_file, Projects(PROJECT_CSV), date(2025, 1, 1)
+    )
+    assert report["imported"] == ["2", "4", "5"]
+    assert [line for line, reason in report["rejected"]] == [2, 3, 4]
+    assert "no project with ID 9" in report["rejected"][2][1]
+    assert written == ["project"]
+    tasks = Tasks(TASK_CSV)
+    tasks.data_from_csv()
+    assert [task.name for task in tasks.objects] == ["task 1", "task 3", "a", "d", "e"]
+    assert tasks.get_object("5").linked_project == ""
+    assert Projects(PROJECT_CSV).find_object("1").task_list == ["2", "4"]
+
+    print_import_report(report, "task")
+    captured = capsys.readouterr()
+    assert "3 task(s) imported" in captured.out
+    assert "3 row(s) rejected" in captured.out
+
+    with open(import_file, "w") as file:
+        file.write("name,deadline\nx,2030-01-01\ny,2030-13-01\n")
+    os.rename(import_file, "temp_import.csv")
+    report = import_data(
+        Projects(PROJECT_CSV), "temp_import.csv", None, date(2025, 1, 1)
+    )
+    assert report["imported"] == ["3"]
+    assert report["rejected"] == [(3, "invalid deadline '2030-13-01'")]
+    os.remove("temp_import.csv")
+    with pytest.raises(ValueError, match="does not exist"):
+        import_data(Projects(PROJECT_CSV), "temp_import.csv")
+    clean_csv_files()
+
+
+def test_snapshot(monkeypatch):
+    """
+    The rows are loaded from the binary snapshot while it matches the csv file,
+    the snapshot follows the appends and is ignored once the csv file is changed by another program.
+    The indexes written with the rows are used while no rows were appended after them.
+    """
+    monkeypatch.setattr(Data, "cache", {})
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 3)
+    project_list.data[0]["task_list"] = ["1", "2"]
+    project_list.data_to_csv()
+    rows, indexes = read_snapshot(
+        PROJECT_CSV + ".snapshot", file_signature(PROJECT_CSV)
+    )
+    assert indexes is None
+    assert rows == Projects(PROJECT_CSV).data_from_csv()
+
+    # a full write gives the indexes of the objects
+    project_list = Projects(PROJECT_CSV)
+    project_list.data_from_csv()
+    project_list.update_object(project_list.get_object("2"), "deadline", "2020-01-01")
+    project_list.save()
+    _, indexes = read_snapshot(PROJECT_CSV + ".snapshot", file_signature(PROJECT_CSV))
+    assert indexes["due_index"] == project_list.due_index
+    assert indexes["sorted_index"] == project_list.sorted_index
+    assert indexes["property_index"] == project_list.property_index
+
+    def no_indexing(self, object_):
+        raise AssertionError("the objects are indexed again")
+
+    Data.cache.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(Data, "index_object", no_indexing)
+        loaded = Projects(PROJECT_CSV)
+        loaded.data_from_csv()
+    assert loaded.due_index == project_list.due_index
+    assert loaded.query(order_by="deadline")[0].id == "2"
+    assert loaded.get_object("2").deadline == "2020-01-01"
+    # indexes made for other closed states are built again
+    Data.cache.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(Data, "closed_states", ("to do",))
+        loaded = Projects(PROJECT_CSV)
+        loaded.data_from_csv()
+        assert loaded.due_index == []
+
+    def no_parsing(self):
+        raise AssertionError("the csv file is parsed")
+
+    Data.cache.clear()
+    with monkeypatch.context() as patch:
+        patch.setattr(Data, "iter_rows", no_parsing)
+        project_list = Projects(PROJECT_CSV)
+        project_list.data_from_csv()
+        assert project_list.get_object("1").task_list == ["1", "2"]
+        project_list.add_object(dict(project_list.data[1], id="4", name="new"))
+        project_list.save()
+        Data.cache.clear()
+        assert [row["name"] for row in Projects(PROJECT_CSV).data_from_csv()] == [
+            "project 1",
+            "project 2",
+            "project 3",
+            "new",
+        ]
+
+    with open(PROJECT_CSV, "a") as file:
+        file.write("5,added,,,2025-01-01,2030-01-01,To do,\n")
+    assert read_snapshot(PROJECT_CSV + ".snapshot", file_signature(PROJECT_CSV)) is None
+    Data.cache.clear()
+    assert Projects(PROJECT_CSV).data_from_csv()[-1]["name"] == "added"
+    rows, indexes = read_snapshot(
+        PROJECT_CSV + ".snapshot", file_signature(PROJECT_CSV)
+    )
+    assert len(rows) == 5
+    assert indexes is not None
+    clean_csv_files()
+
+
+def test_offset_index(monkeypatch):
+    """
+    find_object reads only the row of the id in a file too big to be loaded, with the offset index.
+    """
+    monkeypatch.setattr(Data, "cache", {})
+    monkeypatch.setattr(Data, "stream_threshold", 0)
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 5)
+    task_list.data[1]["detailed_description"] = 'two\nlines, "quoted"'
+    task_list.data_to_csv()
+
+    def no_parsing(self):
+        raise AssertionError("the csv file is parsed")
+
+    monkeypatch.setattr(Data, "iter_rows", no_parsing)
+    task_list = Tasks(TASK_CSV)
+    assert task_list.find_object("2").detailed_description == 'two\nlines, "quoted"'
+    assert task_list.find_object("5").name == "task 5"
+    assert os.path.exists(TASK_CSV + ".offsets")
+    for id_ in ["6", "0", "x"]:
+        with pytest.raises(ValueError, match="No task with this ID"):
+            task_list.find_object(id_)
+
+    # the index is built again for the new version of the file
+    with open(TASK_CSV, "a", newline="") as file:
+        file.write("7,added,,,2025-01-01,2030-01-01,To do,1\r\n")
+    assert task_list.find_object("7").linked_project == "1"
+    assert task_list.find_object("3").name == "task 3"
+
+    # several programs building the index at the same time
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=build_offsets, args=(30,)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    assert not [
+        path for path in os.listdir() if path.startswith(TASK_CSV + ".offsets.")
+    ]
+    clean_csv_files()
+
+
+def build_offsets(count: int) -> None:
+    """
+    Build the offset index of the tasks count times and read a row with it.
+    """
+    signature = file_signature(TASK_CSV)
+    assert signature is not None
+    for _ in range(count):
+        OffsetIndex(TASK_CSV).build(signature)
+        assert Tasks(TASK_CSV).find_object("3").name == "task 3"
+
+
+def test_command_line(monkeypatch, capsys):
+    """
+    The commands of a script are run on the loaded data and each file is written once at the end.
+    """
+    deadline = (date.today() + timedelta(days=10)).isoformat()
+    script = "temp_script.txt"
+    with open(script, "w") as file:
+        file.write(f"""# setup
+project add --name "First project" --deadline {deadline}
+project add --name Second --deadline {deadline}
+task add --name "Task A" --deadline {deadline} --project 1
+task add --name "Task B" --deadline {deadline}
+task add --name Bad --deadline 2020-01-01
+task update 2 --project 2 --state "In progress"
+task update 1 --project 2
+task unknown 1
+
+project delete 1
+task add --name "Task C" --deadline {deadline} --project 9
+""")
+    written = []
+    write_temp_csv = Data.write_temp_csv
+
+    def count_writes(self):
+        written.append(self.data_type)
+        return write_temp_csv(self)
+
+    monkeypatch.setattr(Data, "write_temp_csv", count_writes)
+    command_line(["exec", script], Projects(PROJECT_CSV), Tasks(TASK_CSV))
+    captured = capsys.readouterr()
+    assert "6 command(s) run" in captured.out and "4 failed" in captured.out
+    for line in [6, 8, 9, 12]:
+        assert f"line {line}:" in captured.out
+    assert written == []
+
+    project_list = Projects(PROJECT_CSV)
+    project_list.data_from_csv()
+    assert [(project.id, project.task_list) for project in project_list.objects] == [
+        ("2", ["2"])
+    ]
+    task_list = Tasks(TASK_CSV)
+    task_list.data_from_csv()
+    assert [
+        (task.name, task.linked_project, task.state) for task in task_list.objects
+    ] == [
+        ("Task A", "", "To do"),
+        ("Task B", "2", "In progress"),
+    ]
+
+    command_line(
+        ["task", "update", "1", "--name", "Renamed"],
+        Projects(PROJECT_CSV),
+        Tasks(TASK_CSV),
+    )
+    assert "has been updated successfully" in capsys.readouterr().out
+    assert Tasks(TASK_CSV).find_object("1").name == "Renamed"
+    assert written == ["task"]
+    os.remove(script)
+    clean_csv_files()
+
+
+def test_server():
+    """
+    The server answers the JSON requests from memory and saves the changes in the csv files.
+    """
+    deadline = (date.today() + timedelta(days=10)).isoformat()
+    server = make_server(port=0, store=Store(Projects(PROJECT_CSV), Tasks(TASK_CSV)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def request(method, path, body=None):
+        data = None if body is None else json.dumps(body).encode()
+        try:
+            with urllib.request.urlopen(
+                urllib.request.Request(url + path, data, method=method)
+            ) as response:
+                content = response.read()
+                return response.status, json.loads(content) if content else None
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    try:
+        assert request("GET", "/projects") == (200, [])
+        status, project = request(
+            "POST", "/projects", {"name": "P", "deadline": deadline}
+        )
+        assert status == 201 and project["id"] == "1"
+        for name in ["A", "B"]:
+            status, task = request(
+                "POST", "/tasks", {"name": name, "deadline": deadline, "project": "1"}
+            )
+            assert status == 201 and task["linked_project"] == "1"
+        assert (
+            request("POST", "/tasks", {"name": "C", "deadline": "2020-01-01"})[0] == 400
+        )
+        assert (
+            request(
+                "POST", "/tasks", {"name": "C", "deadline": deadline, "project": "9"}
+            )[0]
+            == 400
+        )
+
+        status, project = request("GET", "/projects/1")
+        assert [task["name"] for task in project["tasks"]] == ["A", "B"]
+        # only a task is linked to a project
+        status, error = request(
+            "POST", "/projects", {"name": "Q", "deadline": deadline, "project": "1"}
+        )
+        assert status == 400 and "'project' can't be changed" in error["error"]
+        status, error = request("PATCH", "/projects/1", {"project": "1"})
+        assert status == 400 and "'project' can't be changed" in error["error"]
+        assert request("GET", "/projects/1")[1]["task_list"] == ["1", "2"]
+        assert [project["id"] for project in request("GET", "/projects")[1]] == ["1"]
+        assert request("PATCH", "/tasks/2", {"state": "Done"})[1]["state"] == "Done"
+        assert [task["id"] for task in request("GET", "/tasks?state=Done")[1]] == ["2"]
+        assert [
+            task["id"] for task in request("GET", "/tasks?offset=1&limit=1")[1]
+        ] == ["2"]
+        assert request("GET", "/tasks/9")[0] == 404
+        assert request("GET", "/users")[0] == 404
+
+        assert request("DELETE", "/projects/1") == (204, None)
+        assert Tasks(TASK_CSV).find_object("1").linked_project == ""
+        assert request("GET", "/projects") == (200, [])
+    finally:
+        server.shutdown()
+        server.server_close()
+    clean_csv_files()
+
+
+def increment_counter(count: int, storage="csv") -> None:
+    """
+    Add 1 to the description of project 1 count times, loading the projects again on a conflict.
+    """
+    done = 0
+    while done < count:
+        project_list = Projects(PROJECT_CSV, storage=storage)
+        project_list.data_from_csv()
+        project = project_list.get_object("1")
+        project_list.update_object(
+            project, "description", str(int(project.description) + 1)
+        )
+        try:
+            project_list.save()
+            done += 1
+        except StaleDataError:
+            ...
+
+
+def read_projects(count: int, errors) -> None:
+    """
+    Load the projects count times, they must always be complete.
+    """
+    for _ in range(count):
+        Data.cache.clear()
+        if len(Projects(PROJECT_CSV).data_from_csv()) != 3:
+            errors.put("incomplete file")
+
+
+def test_concurrent_saves():
+    """
+    Several programs saving the same file at the same time don't lose any update,
+    and the readers always read a complete file.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 3)
+    project_list.data[0]["description"] = "0"
+    project_list.data_to_csv()
+
+    stale = Projects(PROJECT_CSV)
+    stale.data_from_csv()
+    increment_counter(1)
+    with pytest.raises(StaleDataError):
+        with Session(stale):
+            stale.update_object(stale.get_object("2"), "name", "lost update")
+    assert stale.get_object("2").name == "project 2"
+    stale.update_object(stale.get_object("2"), "name", "lost update")
+    with pytest.raises(StaleDataError):
+        stale.save()
+
+    context = multiprocessing.get_context("fork")
+    errors = context.Queue()
+    processes = [
+        context.Process(target=increment_counter, args=(50,)) for _ in range(4)
+    ]
+    processes.append(context.Process(target=read_projects, args=(50, errors)))
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    assert errors.empty()
+    Data.cache.clear()
+    assert Projects(PROJECT_CSV).find_object("1").description == "201"
+    assert Projects(PROJECT_CSV).find_object("2").name == "project 2"
+    clean_csv_files()
+
+
+def test_stale_save_in_menus(monkeypatch, capsys):
+    """
+    A file changed by another user while a menu asks the values is not overwritten,
+    the error is printed and no success message is displayed.
+    """
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 2)
+    project_list.data_to_csv()
+    deadline = f"{date.today() + timedelta(days=30)}"
+
+    def change_file():
+        other = Projects(PROJECT_CSV)
+        other.data_from_csv()
+        other.update_object(other.get_object("2"), "name", "changed by another user")
+        other.save()
+
+    def inputs(answers):
+        answers = iter(answers)
+
+        def input_(prompt):
+            answer = next(answers)
+            if callable(answer):
+                answer()
+                answer = next(answers)
+            return answer
+
+        monkeypatch.setattr("builtins.input", input_)
+
+    inputs(["New", "short", "detailed", change_file, deadline])
+    add_data(Projects(PROJECT_CSV))
+    output = capsys.readouterr().out
+    assert "nothing was saved" in output and "successfully" not in output
+
+    inputs(["1", "name", change_file, "Renamed"])
+    update_data(Projects(PROJECT_CSV), Tasks(TASK_CSV))
+    output = capsys.readouterr().out
+    assert "nothing was saved" in output and "successfully" not in output
+    Data.cache.clear()
+    names = [project.name for project in Projects(PROJECT_CSV).iter_objects()]
+    assert names == ["project 1", "changed by another user"]
+    clean_csv_files()
+
+
+def test_concurrent_journal_saves(monkeypatch):
+    """
+    Several programs saving with the journal storage don't lose any update,
+    when the journal is compacted (removed) by another program than the one appending to it.
+    """
+    project_list = Projects(PROJECT_CSV, storage="journal")
+    project_list.data = make_rows("project", 3)
+    project_list.data[0]["description"] = "0"
+    project_list.data_to_csv()
+    # the journal handle of this process is inherited by the processes
+    increment_counter(1, "journal")
+    monkeypatch.setattr(Data, "journal_compact_threshold", 5)
+
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=increment_counter, args=(30, "journal"))
+        for _ in range(3)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+    increment_counter(1, "journal")
+    Data.cache.clear()
+    project_list = Projects(PROJECT_CSV, storage="journal")
+    assert project_list.find_object("1").description == "92"
+    assert get_journal(PROJECT_CSV + ".journal").count == len(
+        get_journal(PROJECT_CSV + ".journal").read()
+    )
+    clean_csv_files()
+
+
+def test_query(monkeypatch):
+    """
+    Data.query gives the same objects as a scan, with the state, linked_project and deadline indexes
+    kept up to date by the changes.
+    """
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 30)
+    for i, task in enumerate(task_list.data):
+        task["state"] = ["To do", "In progress", "Done"][i % 3]
+        task["deadline"] = f"2030-01-{30 - i % 10:02d}"
+        task["linked_project"] = str(i % 4) if i % 4 else ""
+    task_list.data_to_csv()
+    task_list.data_from_csv()
+
+    def scan(state=None, first="", last="9999", linked_project=None):
+        return [
+            task
+            for task in task_list.objects
+            if (state is None or task.state == state)
+            and first <= task.deadline <= last
+            and (linked_project is None or task.linked_project == linked_project)
+        ]
+
+    def check():
+        for state in [None, "In progress", "Done"]:
+            for first, last in [("", "9999"), ("2030-01-22", "2030-01-25")]:
+                for linked_project in [None, "1"]:
+                    expected = scan(state, first, last, linked_project)
+                    conditions = {"state": state} if state else {}
+                    if linked_project:
+                        conditions["linked_project"] = linked_project
+                    between = (first or None, last) if first else None
+                    found = task_list.query(deadline_between=between, **conditions)
+                    assert found == sorted(expected, key=lambda task: int(task.id))
+                    found = task_list.query(
+                        deadline_between=between,
+                        order_by="-deadline",
+                        limit=3,
+                        **conditions,
+                    )
+                    key = lambda task: (task.deadline, int(task.id))
+                    assert found == sorted(expected, key=key, reverse=True)[:3]
+
+    check()
+    assert [task.id for task in task_list.query(order_by="deadline", limit=2)] == [
+        "10",
+        "20",
+    ]
+    assert [task.name for task in task_list.query(order_by="name", limit=2)] == [
+        "task 1",
+        "task 10",
+    ]
+    with pytest.raises(ValueError, match="does not exist"):
+        task_list.query(priority="high")
+
+    task_list.update_object(task_list.get_object("5"), "deadline", "2030-01-23")
+    task_list.update_object(task_list.get_object("6"), "state", "Done")
+    task_list.delete_object(task_list.get_object("7"))
+    with pytest.raises(ValueError):
+        with Session(task_list):
+            task_list.update_object(task_list.get_object("8"), "deadline", "2031-01-01")
+            task_list.delete_object(task_list.get_object("9"))
+            raise ValueError("canceled")
+    check()
+    task_list.save()
+    Data.cache.clear()
+    task_list.data_from_csv()
+    check()
+
+    simulate_input(monkeypatch, ["Done", "1", "2030-01-20", "", "-deadline", "2"])
+    table = query_data(Tasks(TASK_CSV))
+    assert table.count("Done") == 2 and "2030-01-19" not in table
+    simulate_input(monkeypatch, ["", "", "2030-13-01"])
+    assert query_data(Tasks(TASK_CSV)) == ""
+    clean_csv_files()
+
+
+def test_search(monkeypatch):
+    """
+    Data.search finds the same objects as a scan of the texts, ranked by relevance, with the text index
+    kept up to date by the changes and read back from its file while the csv file doesn't change.
+    The index is read or built at the first search, not when the objects are loaded.
+    """
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 12)
+    words = ["budget", "design", "review", "deploy"]
+    for i, task in enumerate(task_list.data):
+        task["name"] = f"{words[i % 4].title()} {words[i % 3]}"
+        task["detailed_description"] = "Review the budget again" if i == 5 else ""
+    task_list.data_to_csv()
+    task_list.data_from_csv()
+    assert task_list.text_index is None
+    assert not os.path.exists(TASK_CSV + ".words")
+    task_list.search("budget")
+    assert TextIndex.read(TASK_CSV + ".words", file_signature(TASK_CSV)) is not None
+    # kept in the cache with the objects
+    other_list = Tasks(TASK_CSV)
+    other_list.data_from_csv()
+    assert other_list.text_index is task_list.text_index
+
+    def scan(text, any_word=False):
+        match = any if any_word else all
+        return {
+            task.id
+            for task in task_list.objects
+            if match(
+                word
+                in TextIndex.words(
+                    f"{task.name} {task.description} {task.detailed_description}"
+                )
+                for word in TextIndex.words(text)
+            )
+        }
+
+    def check():
+        for text in [
+            "budget",
+            "BUDGET review",
+            "design deploy",
+            "unknown",
+            "budget unknown",
+        ]:
+            for any_word in [False, True]:
+                found = task_list.search(text, any_word)
+                assert {task.id for task in found} == scan(text, any_word)
+        built = TextIndex()
+        for task in task_list.objects:
+            for property_ in task_list.text_properties:
+                built.add(task.id, getattr(task, property_))
+        assert task_list.text_index.postings == built.postings
+
+    check()
+    # "budget" twice in the task 6, once in the others
+    assert task_list.search("budget review")[0].id == "6"
+    assert len(task_list.search("budget", limit=2)) == 2
+
+    task_list.update_object(task_list.get_object("1"), "name", "Deploy the server")
+    task_list.delete_object(task_list.get_object("2"))
+    with pytest.raises(ValueError):
+        with Session(task_list):
+            task_list.update_object(task_list.get_object("3"), "description", "server")
+            task_list.delete_object(task_list.get_object("4"))
+            raise ValueError("canceled")
+    check()
+    assert [task.id for task in task_list.search("server")] == ["1"]
+    task_list.save()
+    postings = task_list.text_index.postings
+    Data.cache.clear()
+    task_list.data_from_csv()
+
+    def no_building(self, id_, text):
+        raise AssertionError("the text index is built again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(TextIndex, "add", no_building)
+        assert [task.id for task in task_list.search("server")] == ["1"]
+    check()
+    assert task_list.text_index.postings == postings
+
+    simulate_input(monkeypatch, ["budget Review", "1", "1"])
+    table = search_data(Tasks(TASK_CSV))
+    assert "task 6 description" in table and "task 7 description" not in table
+    simulate_input(monkeypatch, ["  ,  "])
+    assert search_data(Tasks(TASK_CSV)) == ""
+    clean_csv_files()
+
+
+def test_due(monkeypatch):
+    """
+    Data.due gives the overdue objects and the objects due soon that are not done, like a sort of all
+    the objects, with the deadline index kept up to date by the changes of deadline and state.
+    """
+    today = date(2030, 1, 15)
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 30)
+    for i, task in enumerate(task_list.data):
+        task["deadline"] = f"{today + timedelta(days=i % 10 - 5)}"
+        task["state"] = ["To do", "In Progress", "To do", "Completed"][i % 4]
+    task_list.data_to_csv()
+    task_list.data_from_csv()
+
+    def scan(first, last):
+        tasks = [
+            task
+            for task in task_list.objects
+            if task.state.lower() not in ["completed", "done"]
+            and first <= task.deadline <= last
+        ]
+        return sorted(tasks, key=lambda task: (task.deadline, int(task.id)))
+
+    def check():
+        yesterday = f"{today - timedelta(days=1)}"
+        assert task_list.due(today=today) == scan("", yesterday)
+        assert task_list.due(today=today, limit=2) == scan("", yesterday)[:2]
+        assert task_list.due(3, today=today) == scan("", f"{today + timedelta(days=3)}")
+        assert (
+            task_list.due(3, overdue=False, today=today, limit=4)
+            == scan(f"{today}", f"{today + timedelta(days=3)}")[:4]
+        )
+
+    check()
+    assert all(task.deadline < f"{today}" for task in task_list.due(today=today))
+    task_list.update_object(task_list.get_object("1"), "state", "completed")
+    task_list.update_object(task_list.get_object("4"), "state", "In Progress")
+    task_list.update_object(task_list.get_object("2"), "deadline", "2030-01-01")
+    task_list.delete_object(task_list.get_object("3"))
+    with pytest.raises(ValueError):
+        with Session(task_list):
+            task_list.update_object(task_list.get_object("5"), "state", "Done")
+            task_list.update_object(task_list.get_object("8"), "deadline", "2029-01-01")
+            raise ValueError("canceled")
+    check()
+    assert task_list.due(today=today, limit=1)[0].id == "2"
+    task_list.save()
+    Data.cache.clear()
+    task_list.data_from_csv()
+    check()
+
+    simulate_input(monkeypatch, ["", "1"])
+    table = due_data(Tasks(TASK_CSV), today)
+    assert "days_left" in table and "-14" in table and table.count("2030-01-") == 1
+    simulate_input(monkeypatch, ["soon"])
+    assert due_data(Tasks(TASK_CSV), today) == ""
+    clean_csv_files()
+
+    # the completed tasks of the application data are not overdue
+    shipped_tasks = Tasks()
+    shipped_tasks.data_from_csv()
+    completed = {task.id for task in shipped_tasks.objects if task.state == "Completed"}
+    assert completed and not completed & {
+        task.id for task in shipped_tasks.due(today=today)
+    }
+
+
+def test_report(capsys):
+    """
+    The report of each project gives the same counts as reading the tasks of each project,
+    it is computed once for a version of the tasks file and updated by the changes of single tasks.
+    """
+    today = date(2030, 1, 15)
+    project_list = Projects(PROJECT_CSV)
+    project_list.data = make_rows("project", 3)
+    project_list.data_to_csv()
+    project_list.data_from_csv()
+    task_list = Tasks(TASK_CSV)
+    task_list.data = make_rows("task", 20)
+    for i, task in enumerate(task_list.data):
+        task["linked_project"] = str(i % 4) if i % 4 else ""
+        task["state"] = ["To do", "In Progress", "Completed"][i % 3]
+        task["deadline"] = f"{today + timedelta(days=i - 8)}"
+    task_list.data_to_csv()
+    task_list.data_from_csv()
+
+    def check():
+        rows = task_list.project_report().rows(project_list, today)
+        for row, project in zip(rows, project_list.objects):
+            tasks = [
+                task for task in task_list.objects if task.linked_project == project.id
+            ]
+            open_deadlines = sorted(
+                task.deadline
+                for task in tasks
+                if task.state.lower() not in ["completed", "done"]
+            )
+            upcoming = [
+                deadline for deadline in open_deadlines if deadline >= f"{today}"
+            ]
+            assert row["id"] == project.id and row["tasks"] == len(tasks)
+            for state in ["To do", "In Progress", "Completed", "done"]:
+                assert row.get(state, 0) == sum(task.state == state for task in tasks)
+            assert row["overdue"] == len(open_deadlines) - len(upcoming)
+            assert row["next_deadline"] == (upcoming[0] if upcoming else "")
+
+    def cached_report():
+        other = Tasks(TASK_CSV)
+        other.data_from_csv()
+        return other.project_report()
+
+    check()
+    report = task_list.report
+    assert report is not None and cached_report() is report
+    task_list.update_object(task_list.get_object("2"), "state", "done")
+    task_list.update_object(task_list.get_object("3"), "deadline", "2030-01-01")
+    task_list.update_object(task_list.get_object("6"), "linked_project", "3")
+    task_list.delete_object(task_list.get_object("7"))
+    task_list.add_object({**make_rows("task", 21)[20], "linked_project": "1"})
+    with pytest.raises(ValueError):
+        with Session(task_list):
+            task_list.update_object(task_list.get_object("10"), "state", "Completed")
+            task_list.delete_object(task_list.get_object("11"))
+            raise ValueError("canceled")
+    check()
+    # updated, not computed again
+    assert task_list.report is report
+    task_list.save()
+    assert cached_report() is report
+    Data.cache.clear()
+    task_list.data_from_csv()
+    check()
+
+    table = report_data(Projects(PROJECT_CSV), Tasks(TASK_CSV), today)
+    assert "overdue" in table and "next_deadline" in table and "project 3" in table
+    command_line(["report"], Projects(PROJECT_CSV), Tasks(TASK_CSV))
+    assert "In Progress" in capsys.readouterr().out
+    clean_csv_files()
 
-    clean_csv_files()
\ No newline at end of file
+    # the states of the application data, in the order of their progress
+    shipped_tasks = Tasks()
+    shipped_tasks.data_from_csv()
+    shipped_projects = Projects()
+    shipped_projects.data_from_csv()
+    rows = shipped_tasks.project_report().rows(shipped_projects, today)
+    assert list(rows[0])[3:6] == ["To do", "In Progress", "Completed"]
+    completed = {
+        int(task.id) for task in shipped_tasks.objects if task.state == "Completed"
+    }
+    groups = shipped_tasks.project_report().groups.values()
+    assert completed and not completed & {
+        id_ for group in groups for _, id_ in group["deadlines"]
+    }